@@ -27,6 +27,28 @@ echo "Starting build process for ${ZIP_NAME}..."
 echo "Updating submodules..."
 git submodule update --init --recursive
 
+# 0.4. Validate the bundled shaders
+echo "Validating shaders..."
+if ! python3 tools/validate_shaders.py; then
+    echo "Error: Shader validation failed."
+    exit 1
+fi
+
+# 0.5. Build the shader metadata manifest
+echo "Building shader manifest..."
+if ! python3 tools/build_shader_manifest.py --output shader_manifest.json; then
+    echo "Error: Shader manifest build failed."
+    exit 1
+fi
+
+# 0.6. Build Deck-sized texture variants
+echo "Optimizing textures..."
+rm -rf textures_optimized
+if ! python3 tools/optimize_textures.py --output textures_optimized; then
+    echo "Error: Texture optimization failed."
+    exit 1
+fi
+
 # 1. Build the frontend
 echo "Building frontend..."
 if ! command -v pnpm &> /dev/null; then
@@ -55,8 +77,10 @@ cp -R -L \
     dist \
     shaders \
     textures \
+    textures_optimized \
     main.py \
     utils \
+    shader_manifest.json \
     plugin.json \
     package.json \
     LICENSE \
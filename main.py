@@ -1,23 +1,35 @@
 import decky_plugin
-import json
 import os
 import shutil
 import asyncio
 import time
-import re
 import sys
 from pathlib import Path
 
 # Add current directory to path so local imports work
 sys.path.append(os.path.dirname(os.path.realpath(__file__)))
 
+# Imported first so the other local imports can be timed (utils/profiling.py)
+from utils.profiling import (start_import_profiling, stop_import_profiling, startup_phase, profile_first_rpc,
+                             write_startup_report, read_startup_report, startup_profiling_enabled, set_startup_profiling)
+start_import_profiling()
+
 # Import our separated modules
-from utils.constants import logger, destination_folder, shaders_folder, textures_folder, textures_destination, config_file, crash_file
+from utils.constants import logger, destination_folder
 from utils.state import State
-from utils.config import save_config_immediate, load_config_state
-from utils.shader import parse_shader_params, apply_shader_internal
-from utils.crash import trigger_crash_detection, cancel_crash_detection, read_crash_data, write_crash_data
+from utils.config import save_config, load_config, run_config_op, disable_per_game, copy_profile, assign_profile, clear_profiles, delete_config, compact_config, start_config_compactor, stop_config_compactor
+from utils.shader import get_shader_params_meta_async, apply_shader_internal, active_chain
+from utils.crash import trigger_crash_detection, cancel_crash_detection, read_crash_data, write_crash_data, clear_crash_data, latest_coredump
+from utils.resources import INSTALL_MODES, install_resources
+from utils.compare import start_compare, toggle_compare, compare_stats
+from utils.catalog import catalog_list_async, catalog_packages_async
+from utils.watcher import start_watcher, stop_watcher
+from utils.aio import run_blocking, start_loop_lag_monitor, stop_loop_lag_monitor
+from utils.power import start_power_watcher, stop_power_watcher
+from utils.search import search_shaders
+stop_import_profiling()
 
+@profile_first_rpc
 class Plugin:
 
     # ------------------------------------------------------------------
@@ -27,54 +39,64 @@ class Plugin:
     # Event A: on_plugin_load()
     async def _main(self):
         try:
-            Plugin._install_resources()
             logger.info("Plugin Initialized (Event A: on_plugin_load)")
             
             # 1. Load config
-            load_config_state(State.current_appid)
+            with startup_phase("load_config"):
+                await load_config(State.current_appid)
+            start_config_compactor()
+            with startup_phase("install_resources"):
+                await Plugin._install_resources()
+            with startup_phase("start_watcher"):
+                await start_watcher()
+            with startup_phase("start_power_watcher"):
+                await start_power_watcher(Plugin._on_power_changed)
             
             # 1.5. Force disable if old version exists
             old_dir = decky_plugin.DECKY_USER_HOME + "/homebrew/plugins/Reshadeck"
             if os.path.isdir(old_dir):
                 State.master_switch = False
-                save_config_immediate()
+                await save_config()
             
             # 2. Startup Canary Check
             if State.master_switch and State.active_shader != "None":
-                crash_data = read_crash_data()
+                with startup_phase("read_crash_data"):
+                    crash_data = await run_blocking(read_crash_data)
                 try:
                     last_known_timestamp = float(crash_data.get("last_timestamp", "0"))
                 except ValueError:
                     last_known_timestamp = 0.0
                     
-                coredump_path = Path("/var/lib/systemd/coredump")
                 crashed_recently = False
                 
-                if coredump_path.exists():
-                    files = list(coredump_path.glob("core.gamescope-wl.*.zst"))
-                    if files:
-                        latest_file = max(files, key=os.path.getmtime)
-                        latest_timestamp = latest_file.stat().st_mtime
-                        
-                        # Check if crash is new and within last 5 minutes
-                        if latest_timestamp > last_known_timestamp and (time.time() - latest_timestamp) <= 300:
-                            crashed_recently = True
+                with startup_phase("coredump_scan"):
+                    latest = await run_blocking(latest_coredump)
+                if latest is not None:
+                    latest_file, latest_timestamp = latest
+                    
+                    # Check if crash is new and within last 5 minutes
+                    if latest_timestamp > last_known_timestamp and (time.time() - latest_timestamp) <= 300:
+                        crashed_recently = True
                             
                 if crashed_recently:
                     logger.error("Canary check failed. Recent crash detected on startup.")
                     State.master_switch = False
                     State.crash_detected = True
-                    save_config_immediate()
-                    write_crash_data(1, str(time.time()))
+                    await save_config()
+                    await run_blocking(write_crash_data, 1, str(time.time()))
                     return # Exit without applying
                 
             # 3. Apply shader
             if State.master_switch and State.active_shader != "None":
                 await asyncio.sleep(3) # Give X time to initialize
-                await apply_shader_internal(State.active_shader)
+                with startup_phase("initial_apply"):
+                    await apply_shader_internal(State.active_shader)
                 
         except Exception:
             logger.exception("main")
+        finally:
+            if startup_profiling_enabled():
+                await run_blocking(write_startup_report)
 
     # Event B: on_master_switch_changed(is_enabled)
     async def set_master_enabled(self, enabled: bool):
@@ -103,7 +125,7 @@ class Plugin:
             await apply_shader_internal(State.active_shader)
             
         # 6. Save config to disk
-        save_config_immediate()
+        await save_config()
 
     # Event C: on_active_app_changed(appid)
     async def set_current_game_info(self, appid: str, appname: str):
@@ -132,28 +154,34 @@ class Plugin:
         # 3. If master_switch == false -> Halt execution
         if not State.master_switch:
              # Still load config so the UI updates correctly
-             load_config_state(appid)
+             await load_config(appid)
              return
              
         # 4,5,6. Load config profile
-        load_config_state(appid)
+        await load_config(appid)
         
         # 7. Execute apply_shader
         await apply_shader_internal(State.active_shader)
 
     # Event E: on_shader_changed(new_shader)
     async def set_shader(self, shader_name: str):
+        # Picking a single shader replaces any chain
+        await self._select_shader(shader_name, [])
+
+    async def _select_shader(self, shader_name: str, chained: list):
+        """Set the active shader and the shaders chained after it together, then apply."""
         # We handle toggling/setting in the same handler
         logger.info(f"Event E: on_shader_changed({shader_name})")
         
         # 1. Cancel active crash detection tasks
         cancel_crash_detection()
         
-        # 2. Update active_shader
+        # 2. Update active_shader and its chain
         State.active_shader = shader_name
+        State.chained_shaders = list(chained) if shader_name != "None" else []
         
         # 3. Save config
-        save_config_immediate()
+        await save_config()
         
         # 4. If master_switch == false -> Halt execution
         if not State.master_switch:
@@ -172,21 +200,33 @@ class Plugin:
     async def toggle_shader(self, shader_name: str):
         await self.set_shader(shader_name)
 
+    async def get_shader_chain(self):
+        if State.active_shader == "None":
+            return []
+        return active_chain(State.active_shader)
+
+    async def set_shader_chain(self, shader_names: list):
+        """Apply shader_names in order as one merged effect; the first one is the active shader."""
+        chain = []
+        for name in shader_names or []:
+            if name != "None" and name not in chain:
+                chain.append(name)
+        await self._select_shader(chain[0] if chain else "None", chain[1:])
+
     # Event F: on_parameters_changed(new_parameters)
-    async def set_shader_param(self, name: str, value):
-        shader = State.active_shader
+    async def set_shader_param(self, name: str, value, shader_name: str = None):
+        shader = shader_name or State.active_shader
         if shader == "None":
             return
             
         # Coerce type
-        meta_list = State.params_meta.get(shader)
-        if meta_list:
-            for p in meta_list:
-                if p["name"] == name:
-                    if p["type"] == "float": value = float(value)
-                    elif p["type"] == "bool": value = bool(value)
-                    elif p["type"] == "int": value = int(value)
-                    break
+        # Use the cached metadata directly so rapid slider updates can't reorder
+        meta = State.params_meta.get(shader)
+        if meta is None:
+            meta = await get_shader_params_meta_async(shader)
+        spec = meta.get(name)
+        if spec is not None:
+            value = spec.coerce(value)
 
         # 1. Update shader_parameters
         if shader not in State.shader_parameters:
@@ -199,7 +239,7 @@ class Plugin:
         logger.info("Event G: apply_shader (Manual from UI)")
         
         cancel_crash_detection()
-        save_config_immediate()
+        await save_config()
         
         if not State.master_switch:
             return
@@ -207,31 +247,60 @@ class Plugin:
         trigger_crash_detection()
         await apply_shader_internal(State.active_shader)
 
+    # ------------------------------------------------------------------
+    # A/B comparison (pre-staged effects, toggled by X property swap)
+    # ------------------------------------------------------------------
+    async def start_compare(self, shader_a: str, shader_b: str = "None"):
+        logger.info(f"Starting compare: {shader_a} vs {shader_b}")
+        if not State.master_switch:
+            return False
+        cancel_crash_detection()
+        trigger_crash_detection()
+        return await start_compare(shader_a, shader_b)
+
+    async def toggle_compare(self):
+        return await toggle_compare()
+
+    async def stop_compare(self):
+        # Reverting to the configured shader discards the compare files
+        stats = compare_stats()
+        logger.info(f"Stopping compare: {stats}")
+        cancel_crash_detection()
+        if State.master_switch and State.active_shader != "None":
+            trigger_crash_detection()
+            await apply_shader_internal(State.active_shader)
+        else:
+            await apply_shader_internal("None")
+        return stats
+
+    async def get_compare_state(self):
+        if not State.compare:
+            return {"active": False, "stats": compare_stats()}
+        return {
+            "active": True,
+            "shaders": State.compare["shaders"],
+            "side": State.compare["side"],
+            "stats": compare_stats(),
+        }
+
     # ------------------------------------------------------------------
     # Utility getters/setters for UI (Event D: on_ui_opened implicit syncing)
     # ------------------------------------------------------------------
-    async def get_shader_params(self):
-        shader = State.active_shader
+    async def get_shader_params(self, shader_name: str = None):
+        shader = shader_name or State.active_shader
         if shader == "None":
             return []
-        params = parse_shader_params(shader)
-        State.params_meta[shader] = params
         saved = State.shader_parameters.get(shader, {})
-        result = []
-        for p in params:
-            entry = dict(p)
-            entry["value"] = saved.get(p["name"], p["default"])
-            result.append(entry)
-        return result
-
-    async def reset_shader_params(self):
-        shader = State.active_shader
+        meta = await get_shader_params_meta_async(shader)
+        return [p.to_dict(saved.get(p.name, p.default)) for p in meta]
+
+    async def reset_shader_params(self, shader_name: str = None):
+        shader = shader_name or State.active_shader
         if shader == "None":
             return
-        params = parse_shader_params(shader)
-        State.params_meta[shader] = params
-        State.shader_parameters[shader] = {p["name"]: p["default"] for p in params}
-        save_config_immediate()
+        meta = await get_shader_params_meta_async(shader)
+        State.shader_parameters[shader] = meta.defaults()
+        await save_config()
         
         # Trigger an apply if allowed
         if State.master_switch:
@@ -252,26 +321,48 @@ class Plugin:
         # Replicates Event C logic conceptually when mode flips
         State.per_game_mode = enabled
         if enabled:
-            save_config_immediate()
+            await save_config()
         else:
             # Revert to global
-            try:
-                if os.path.exists(config_file):
-                    with open(config_file, "r") as f:
-                        data = json.load(f)
-                    if State.current_appid not in data:
-                        data[State.current_appid] = {}
-                    data[State.current_appid]["per_game"] = False
-                    with open(config_file, "w") as f:
-                        json.dump(data, f, indent=4)
-            except Exception:
-                pass
-            load_config_state(State.current_appid)
+            await run_config_op(disable_per_game, State.current_appid)
+            await load_config(State.current_appid)
             
         # Re-apply
         if State.master_switch:
             await apply_shader_internal(State.active_shader)
 
+    # ------------------------------------------------------------------
+    # Bulk profile operations (one config write for N appids)
+    # ------------------------------------------------------------------
+    async def _after_bulk_update(self, changed: list):
+        # Only the running app needs its state reloaded and re-applied
+        if State.current_appid not in changed:
+            return
+        await load_config(State.current_appid)
+        if State.master_switch:
+            cancel_crash_detection()
+            if State.active_shader != "None":
+                trigger_crash_detection()
+            await apply_shader_internal(State.active_shader)
+
+    async def copy_profile(self, source_appid: str, appids: list):
+        logger.info(f"Copying profile of {source_appid} to {len(appids)} app(s)")
+        changed = await run_config_op(copy_profile, source_appid, appids)
+        await self._after_bulk_update(changed)
+        return changed
+
+    async def assign_profile(self, appids: list, shader_name: str, category: str = "Default", parameters: dict = None):
+        logger.info(f"Assigning {shader_name} to {len(appids)} app(s)")
+        changed = await run_config_op(assign_profile, appids, shader_name, category, parameters)
+        await self._after_bulk_update(changed)
+        return changed
+
+    async def clear_profiles(self, appids: list):
+        logger.info(f"Clearing per-game profiles of {len(appids)} app(s)")
+        changed = await run_config_op(clear_profiles, appids)
+        await self._after_bulk_update(changed)
+        return changed
+
     async def get_game_info(self):
         return {
             "appid": State.current_appid,
@@ -283,7 +374,73 @@ class Plugin:
     async def set_active_category(self, category: str):
         if category != State.active_category:
             State.active_category = category
-            save_config_immediate()
+            await save_config()
+
+    async def get_install_mode(self):
+        return State.install_mode
+
+    async def set_install_mode(self, mode: str):
+        if mode not in INSTALL_MODES:
+            return False
+        logger.info(f"Setting install_mode: {mode}")
+        State.install_mode = mode
+        await save_config()
+        await Plugin._install_resources()
+        return True
+
+    async def get_params_cache_stats(self):
+        return State.params_meta.stats()
+
+    # ------------------------------------------------------------------
+    # Battery-aware downgrade
+    # ------------------------------------------------------------------
+    @staticmethod
+    async def _on_power_changed():
+        if not State.master_switch or State.active_shader == "None" or State.battery_shader == "None":
+            return
+        cancel_crash_detection()
+        trigger_crash_detection()
+        await apply_shader_internal(State.active_shader)
+
+    async def get_power_state(self):
+        return {"on_battery": State.on_battery, "battery_shader": State.battery_shader}
+
+    async def set_battery_shader(self, shader_name: str):
+        logger.info(f"Setting battery_shader: {shader_name}")
+        State.battery_shader = shader_name
+        await save_config()
+        if State.on_battery and State.master_switch and State.active_shader != "None":
+            cancel_crash_detection()
+            trigger_crash_detection()
+            await apply_shader_internal(State.active_shader)
+
+    async def get_loop_lag_stats(self):
+        return {
+            "enabled": State.loop_lag_task is not None,
+            "events": State.loop_lag_events,
+            "max_ms": State.loop_lag_max * 1000.0,
+        }
+
+    async def set_loop_lag_monitor(self, enabled: bool):
+        if enabled:
+            State.loop_lag_events = 0
+            State.loop_lag_max = 0.0
+            start_loop_lag_monitor()
+        else:
+            stop_loop_lag_monitor()
+
+    async def get_startup_profile(self):
+        return {
+            "enabled": startup_profiling_enabled(),
+            "report": await run_blocking(read_startup_report),
+        }
+
+    async def set_startup_profiling(self, enabled: bool):
+        """Turn startup profiling on or off for the next plugin load."""
+        return await run_blocking(set_startup_profiling, enabled)
+
+    async def get_validation_errors(self):
+        return State.validation_errors
 
     async def get_crash_detected(self):
         return State.crash_detected
@@ -293,27 +450,27 @@ class Plugin:
         return os.path.isdir(old_dir)
 
     async def get_shader_list(self, category: str = "Default"):
-        temp_pattern = re.compile(r"^.+_[A-Za-z0-9]{6}\.fx$")
-        target_dir = Path(destination_folder)
-        if category not in ("Default", "None"):
-             target_dir = target_dir / category
-        if not target_dir.exists():
-            return []
-        files = target_dir.glob("*.fx")
-        results = []
-        for p in files:
-            if p.name.startswith("."): continue
-            if not temp_pattern.match(p.name):
-                if category == "Default": results.append(p.name)
-                else: results.append(f"{category}/{p.name}")
-        return sorted(results, key=str.lower)
+        return await catalog_list_async(category)
 
     async def get_shader_packages(self):
-        p = Path(destination_folder)
-        if not p.exists(): return ["Default"]
-        dirs = [x.name for x in p.iterdir() if x.is_dir() and not x.name.startswith(".")]
-        dirs = [d for d in dirs if d.lower() != "default"]
-        return ["Default"] + sorted(dirs, key=str.lower)
+        return await catalog_packages_async()
+
+    async def search_shaders(self, query: str):
+        start = time.perf_counter()
+        hits = await search_shaders(query)
+        logger.debug(f"search_shaders({query!r}): {len(hits)} hit(s) in {(time.perf_counter() - start) * 1000.0:.1f} ms")
+        return hits
+
+    async def get_catalog_version(self):
+        return State.catalog_version
+
+    async def get_live_reload(self):
+        return State.live_reload
+
+    async def set_live_reload(self, enabled: bool):
+        logger.info(f"Setting live_reload: {enabled}")
+        State.live_reload = enabled
+        await save_config()
 
     async def get_current_effect(self):
         try:
@@ -335,20 +492,26 @@ class Plugin:
             return {"effect": "None"}
 
     async def reset_reshade_directory(self):
+        stop_watcher()
         reshade_root = Path(destination_folder).parent 
         if reshade_root.exists():
             try:
-                shutil.rmtree(reshade_root)
+                await run_blocking(shutil.rmtree, reshade_root)
             except Exception as e:
                 logger.error(f"Failed to delete reshade directory: {e}")
+                await start_watcher()
                 return False
-        Plugin._install_resources()
+        State.installed_dependencies = set()
+        State.compiled_chains.clear()
+        await Plugin._install_resources()
+        await start_watcher()
         return True
 
     async def reset_configuration(self):
         try:
-            if os.path.exists(config_file): os.remove(config_file)
-            if os.path.exists(crash_file): os.remove(crash_file)
+            # Under the config lock so a running compaction can't write it back
+            await run_config_op(delete_config)
+            await run_blocking(clear_crash_data)
         except Exception:
             return False
 
@@ -357,8 +520,13 @@ class Plugin:
         State.per_game_mode = False
         State.active_category = "Default"
         State.shader_parameters = {}
-        State.params_meta = {}
+        State.chained_shaders = []
+        State.compiled_chains.clear()
+        State.params_meta.clear()
         State.crash_detected = False
+        State.install_mode = "lazy"
+        State.live_reload = False
+        State.battery_shader = "None"
         
         if State.debounce_task:
             State.debounce_task.cancel()
@@ -367,29 +535,14 @@ class Plugin:
         await apply_shader_internal("None")
         return True
 
+    async def _unload(self):
+        stop_watcher()
+        stop_loop_lag_monitor()
+        stop_power_watcher()
+        cancel_crash_detection()
+        stop_config_compactor()
+        await compact_config()
+
     @staticmethod
-    def _install_resources():
-        try:
-            Path(destination_folder).mkdir(parents=True, exist_ok=True)
-            try:
-                shutil.copytree(shaders_folder, destination_folder, dirs_exist_ok=True)
-            except Exception:
-                pass
-            for root, dirs, files in os.walk(destination_folder):
-                for f in files:
-                    if f.endswith((".fx", ".fxh", ".sh")):
-                        try:
-                            path = os.path.join(root, f)
-                            os.chmod(path, 0o644)
-                            if f.endswith(".sh"):
-                                os.chmod(path, 0o755)
-                        except: pass
-            if Path(textures_folder).exists():
-                try:
-                    shutil.copytree(textures_folder, textures_destination, dirs_exist_ok=True)
-                    for root, dirs, files in os.walk(textures_destination):
-                        for f in files: os.chmod(os.path.join(root, f), 0o644)
-                except Exception:
-                    pass
-        except Exception as e:
-            logger.error(f"Failed to install resources: {e}")
+    async def _install_resources():
+        await run_blocking(install_resources, State.install_mode)
@@ -0,0 +1,271 @@
+"""
+Headless end-to-end apply latency harness.
+
+Drives the real Plugin from main.py without a Deck: decky_plugin is replaced
+by an in-process module pointing at a throwaway home, and xprop is replaced by
+a local stand-in on PATH that records when GAMESCOPE_RESHADE_EFFECT is set.
+Everything under utils/ runs unmodified.
+
+A trace is a JSON-lines file of recorded RPC calls:
+
+    {"at": 0.00, "call": "set_current_game_info", "args": ["1091500", "Cyberpunk 2077"]}
+    {"at": 0.35, "call": "set_shader_param", "args": ["Sharpness", 0.42]}
+    {"at": 0.36, "call": "apply_shader", "args": []}
+
+Without --trace a synthetic scenario (app switches, slider drags, master
+toggles) is generated. In a trace, a set_shader_param on "__from_params__"
+targets the first ranged numeric parameter of the active shader and its
+value is a fraction of that parameter's ui_min..ui_max range. The report has per-call latency percentiles, the
+RPC-to-property-set latency, applies per second, subprocess counts and
+bytes written by the plugin process.
+
+Usage: python3 tools/apply_harness.py [--trace FILE] [--scenario NAME] [--speed X] [--json FILE]
+"""
+import os
+import sys
+import json
+import time
+import types
+import shutil
+import random
+import asyncio
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+FAKE_XPROP = """#!/bin/bash
+# Stand-in for xprop: keeps GAMESCOPE_RESHADE_EFFECT in a file and logs every call
+STATE="{state}"
+LOG="{log}"
+echo "$(date +%s.%N) $*" >> "$LOG"
+if [ "$2" = "-remove" ]; then
+    rm -f "$STATE"
+elif [ "$2" = "-f" ]; then
+    echo "${{@: -1}}" > "$STATE"
+elif [ -f "$STATE" ]; then
+    echo "GAMESCOPE_RESHADE_EFFECT(UTF8_STRING) = \\"$(cat "$STATE")\\""
+else
+    echo "GAMESCOPE_RESHADE_EFFECT:  not found."
+fi
+"""
+
+SHADERS = ["CAS.fx", "CRT/CRTGeom.fx", "CRT/zfast_crt.fx", "ImageAdjustment.fx", "CRT/CRT-NewPixie.fx"]
+APPS = [("1091500", "Cyberpunk 2077"), ("1245620", "Elden Ring"), ("steamos", "SteamOS"), ("730", "Counter-Strike 2")]
+
+
+def synthetic_trace(scenario: str, events: int, seed: int) -> list:
+    """Build a trace resembling real use: switch apps, pick shaders, drag sliders, flip the master switch."""
+    rng = random.Random(seed)
+    trace = []
+    at = 0.0
+
+    def add(call, *args, gap=0.05):
+        nonlocal at
+        trace.append({"at": round(at, 3), "call": call, "args": list(args)})
+        at += gap
+
+    add("set_master_enabled", True)
+    add("set_shader", rng.choice(SHADERS), gap=0.3)
+    while len(trace) < events:
+        kind = scenario if scenario != "mixed" else rng.choice(["apps", "sliders", "sliders", "toggles", "shaders"])
+        if kind == "apps":
+            appid, name = rng.choice(APPS)
+            add("set_current_game_info", appid, name, gap=rng.uniform(0.5, 2.0))
+        elif kind == "shaders":
+            add("set_shader", rng.choice(SHADERS), gap=0.3)
+            add("get_shader_params", gap=0.1)
+        elif kind == "sliders":
+            add("get_shader_params", gap=0.1)
+            name = "__from_params__"
+            for _ in range(rng.randint(5, 20)):
+                add("set_shader_param", name, round(rng.random(), 3), gap=rng.uniform(0.02, 0.08))
+            add("apply_shader", gap=0.2)
+        elif kind == "toggles":
+            add("set_master_enabled", False, gap=0.3)
+            add("set_master_enabled", True, gap=0.3)
+    return trace[:events]
+
+
+def load_trace(path: str) -> list:
+    with open(path, "r") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def install_fake_decky(sandbox: Path):
+    """Register an in-process decky_plugin module rooted in the sandbox."""
+    mod = types.ModuleType("decky_plugin")
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(message)s")
+    mod.logger = logging.getLogger("reshadeck-harness")
+    mod.DECKY_USER_HOME = str(sandbox / "home")
+    mod.DECKY_HOME = str(sandbox / "home" / "homebrew")
+    mod.DECKY_PLUGIN_DIR = str(ROOT)
+    mod.DECKY_PLUGIN_SETTINGS_DIR = str(sandbox / "settings")
+    mod.DECKY_PLUGIN_RUNTIME_DIR = str(sandbox / "runtime")
+    mod.DECKY_PLUGIN_LOG_DIR = str(sandbox / "logs")
+    for d in ("home", "settings", "runtime", "logs"):
+        (sandbox / d).mkdir(parents=True, exist_ok=True)
+    sys.modules["decky_plugin"] = mod
+
+
+def install_fake_xprop(sandbox: Path) -> Path:
+    bin_dir = sandbox / "bin"
+    bin_dir.mkdir(parents=True, exist_ok=True)
+    log = sandbox / "xprop.log"
+    xprop = bin_dir / "xprop"
+    xprop.write_text(FAKE_XPROP.format(state=sandbox / "xprop.state", log=log))
+    xprop.chmod(0o755)
+    os.environ["PATH"] = f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}"
+    log.touch()
+    return log
+
+
+def _proc_wchar() -> int:
+    try:
+        with open("/proc/self/io", "r") as f:
+            for line in f:
+                if line.startswith("wchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def percentiles(samples: list) -> dict:
+    if not samples:
+        return {"count": 0}
+    s = sorted(samples)
+    pick = lambda q: s[min(len(s) - 1, int(round(q * (len(s) - 1))))]
+    return {
+        "count": len(s),
+        "p50_ms": pick(0.50),
+        "p90_ms": pick(0.90),
+        "p99_ms": pick(0.99),
+        "max_ms": s[-1],
+        "mean_ms": sum(s) / len(s),
+    }
+
+
+async def replay(trace: list, speed: float, xprop_log: Path) -> dict:
+    import main
+    from utils.state import State
+
+    spawned = {"count": 0, "by_program": {}}
+    real_exec = asyncio.create_subprocess_exec
+
+    async def counting_exec(program, *args, **kwargs):
+        spawned["count"] += 1
+        key = os.path.basename(str(program))
+        spawned["by_program"][key] = spawned["by_program"].get(key, 0) + 1
+        return await real_exec(program, *args, **kwargs)
+
+    asyncio.create_subprocess_exec = counting_exec
+
+    plugin = main.Plugin()
+    await main.Plugin._install_resources()
+    await main.load_config(State.current_appid)
+
+    latencies = {}
+    property_latencies = []
+    applies = 0
+    log_offset = xprop_log.stat().st_size
+    wchar_start = _proc_wchar()
+    start = time.perf_counter()
+
+    try:
+        for event in trace:
+            if speed > 0:
+                delay = event.get("at", 0.0) / speed - (time.perf_counter() - start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            call = event["call"]
+            args = list(event.get("args", []))
+            if call == "set_shader_param" and args and args[0] == "__from_params__":
+                params = await plugin.get_shader_params()
+                ranged = [p for p in params if p["type"] in ("float", "int") and "ui_min" in p and "ui_max" in p]
+                if not ranged:
+                    continue
+                spec = ranged[0]
+                value = spec["ui_min"] + float(args[1]) * (spec["ui_max"] - spec["ui_min"])
+                args[0] = spec["name"]
+                args[1] = int(round(value)) if spec["type"] == "int" else round(value, 3)
+
+            wall = time.time()
+            t0 = time.perf_counter()
+            await getattr(plugin, call)(*args)
+            elapsed_ms = (time.perf_counter() - t0) * 1000.0
+            latencies.setdefault(call, []).append(elapsed_ms)
+
+            with open(xprop_log, "r") as f:
+                f.seek(log_offset)
+                new_lines = f.read().splitlines()
+                log_offset = f.tell()
+            sets = [float(line.split()[0]) for line in new_lines if " -set " in line or " -remove " in line]
+            if sets:
+                applies += len(sets)
+                property_latencies.append((sets[-1] - wall) * 1000.0)
+    finally:
+        asyncio.create_subprocess_exec = real_exec
+        for task in (State.active_crash_monitor_task, State.debounce_task):
+            if task:
+                task.cancel()
+
+    duration = time.perf_counter() - start
+    return {
+        "events": len(trace),
+        "duration_s": duration,
+        "applies": applies,
+        "applies_per_s": applies / duration if duration > 0 else 0.0,
+        "rpc_latency": {call: percentiles(v) for call, v in sorted(latencies.items())},
+        "rpc_to_property_set": percentiles(property_latencies),
+        "subprocesses": spawned,
+        "bytes_written": _proc_wchar() - wchar_start,
+    }
+
+
+def print_report(report: dict):
+    print(f"events: {report['events']}  duration: {report['duration_s']:.2f}s  "
+          f"applies: {report['applies']} ({report['applies_per_s']:.1f}/s)")
+    print(f"subprocesses: {report['subprocesses']['count']} {report['subprocesses']['by_program']}")
+    print(f"bytes written (plugin process): {report['bytes_written']}")
+    print(f"{'call':<28}{'n':>6}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}")
+    rows = list(report["rpc_latency"].items()) + [("-> property set", report["rpc_to_property_set"])]
+    for call, p in rows:
+        if not p.get("count"):
+            continue
+        print(f"{call:<28}{p['count']:>6}{p['p50_ms']:>10.2f}{p['p90_ms']:>10.2f}{p['p99_ms']:>10.2f}{p['max_ms']:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--trace", help="JSON-lines trace of RPC calls to replay")
+    parser.add_argument("--scenario", default="mixed", choices=["mixed", "apps", "sliders", "toggles", "shaders"])
+    parser.add_argument("--events", type=int, default=200, help="events in a synthetic scenario")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--speed", type=float, default=0.0, help="replay speed factor, 0 = as fast as possible")
+    parser.add_argument("--json", help="also write the report as JSON to this file")
+    parser.add_argument("--keep", action="store_true", help="keep the sandbox directory")
+    args = parser.parse_args()
+
+    trace = load_trace(args.trace) if args.trace else synthetic_trace(args.scenario, args.events, args.seed)
+
+    sandbox = Path(tempfile.mkdtemp(prefix="reshadeck-harness-"))
+    install_fake_decky(sandbox)
+    xprop_log = install_fake_xprop(sandbox)
+    sys.path.insert(0, str(ROOT))
+
+    report = asyncio.run(replay(trace, args.speed, xprop_log))
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=4)
+    if args.keep:
+        print(f"sandbox: {sandbox}")
+    else:
+        shutil.rmtree(sandbox, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
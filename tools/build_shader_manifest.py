@@ -0,0 +1,83 @@
+"""
+Build the shader metadata manifest shipped with releases.
+
+Parses every bundled .fx (including the SweetFX and Ptho-FX submodules) in a
+process pool and writes a compact JSON manifest with parameters, labels,
+ranges, dependencies and content hashes. At runtime utils/manifest.py uses it
+instead of parsing, as long as the shader's hash still matches.
+
+Usage: python3 tools/build_shader_manifest.py [--shaders DIR] [--output FILE] [--jobs N]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from utils.fx import parse_shader_text, resolve_dependencies, content_hash, MANIFEST_VERSION  # noqa: E402
+
+
+def find_shaders(shaders_dir: Path) -> list[str]:
+    names = []
+    for root, dirs, files in os.walk(shaders_dir, followlinks=True):
+        for f in files:
+            if f.endswith(".fx") and not f.startswith("."):
+                names.append((Path(root) / f).relative_to(shaders_dir).as_posix())
+    return sorted(names)
+
+
+def build_entry(job):
+    shaders_dir, name = job
+    path = Path(shaders_dir) / name
+    try:
+        raw = path.read_bytes()
+        text = raw.decode("utf-8", errors="replace")
+        params = parse_shader_text(name, text)
+        includes, textures = resolve_dependencies(name, text, Path(shaders_dir))
+    except Exception as e:
+        return name, None, str(e)
+    return name, {
+        "hash": content_hash(raw),
+        "params": [p.to_dict() for p in params],
+        "includes": includes,
+        "textures": textures,
+    }, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--shaders", default=str(ROOT / "shaders"))
+    parser.add_argument("--output", default=str(ROOT / "shader_manifest.json"))
+    parser.add_argument("--jobs", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    shaders_dir = Path(args.shaders)
+    names = find_shaders(shaders_dir)
+
+    shaders = {}
+    skipped = 0
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        for name, entry, error in pool.map(build_entry, [(str(shaders_dir), n) for n in names], chunksize=8):
+            if entry is None:
+                # Left out on purpose: the runtime falls back to live parsing
+                print(f"Warning: skipping {name}: {error}", file=sys.stderr)
+                skipped += 1
+                continue
+            shaders[name] = entry
+
+    with open(args.output, "w") as f:
+        json.dump({"version": MANIFEST_VERSION, "shaders": shaders}, f, separators=(",", ":"), sort_keys=True)
+
+    elapsed = time.perf_counter() - start
+    size = os.path.getsize(args.output)
+    print(f"Wrote {args.output}: {len(shaders)} shaders, {skipped} skipped, {size} bytes in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+Produce Deck-sized, recompressed variants of the textures bundled shaders load.
+
+For every `texture X < source = "..."; > { Width = W; Height = H; }` block in
+the bundled .fx files, the referenced PNG is:
+  * downscaled (box filter) to fit the declared size, keeping its aspect
+    ratio, when it is larger - ReShade resizes to the declared size on
+    load anyway, so the extra pixels only cost I/O and upload time. Never
+    below the declared size: VRAM follows the declared Width/Height, and
+    a smaller source is only stretched back up, blurrier;
+  * stripped of ancillary chunks (text, time, color profiles, ...);
+  * re-filtered per scanline and recompressed at zlib level 9.
+
+Variants are written to textures_optimized/ mirroring textures/, only when
+they are smaller. utils/resources.py installs them in place of the originals.
+Stdlib only: no Pillow needed on the build machine.
+
+Usage: python3 tools/optimize_textures.py [--shaders DIR] [--textures DIR] [--output DIR]
+"""
+import os
+import re
+import sys
+import zlib
+import struct
+import argparse
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Chunks that change how stb_image (used by ReShade) decodes the image
+KEEP_CHUNKS = (b"IHDR", b"PLTE", b"tRNS", b"IEND")
+
+_RE_TEXTURE = re.compile(
+    r'\btexture\s+\w+\s*<[^>]*?\bsource\s*=\s*"([^"]+)"[^>]*>\s*\{([^}]*)\}',
+    re.DOTALL,
+)
+_RE_WIDTH = re.compile(r"\bWidth\s*=\s*(\d+)")
+_RE_HEIGHT = re.compile(r"\bHeight\s*=\s*(\d+)")
+
+_CHANNELS = {0: 1, 2: 3, 4: 2, 6: 4}  # 8-bit color types we can resample
+
+
+def find_texture_sizes(shaders_dir: Path) -> dict:
+    """{texture source: (width, height)} as declared by the shaders (largest wins)."""
+    sizes = {}
+    for root, dirs, files in os.walk(shaders_dir, followlinks=True):
+        for f in files:
+            if not f.endswith((".fx", ".fxh")):
+                continue
+            text = (Path(root) / f).read_text(encoding="utf-8", errors="replace")
+            for m in _RE_TEXTURE.finditer(text):
+                w = _RE_WIDTH.search(m.group(2))
+                h = _RE_HEIGHT.search(m.group(2))
+                if not (w and h):
+                    continue
+                size = (int(w.group(1)), int(h.group(1)))
+                prev = sizes.get(m.group(1))
+                sizes[m.group(1)] = size if prev is None else (max(prev[0], size[0]), max(prev[1], size[1]))
+    return sizes
+
+
+# ---------------------------------------------------------------------------
+# Minimal PNG codec
+# ---------------------------------------------------------------------------
+
+def read_chunks(data: bytes) -> list:
+    if not data.startswith(PNG_SIGNATURE):
+        raise ValueError("not a PNG file")
+    chunks = []
+    pos = len(PNG_SIGNATURE)
+    while pos < len(data):
+        length, kind = struct.unpack(">I4s", data[pos:pos + 8])
+        chunks.append((kind, data[pos + 8:pos + 8 + length]))
+        pos += 12 + length
+    return chunks
+
+
+def write_chunk(kind: bytes, body: bytes) -> bytes:
+    return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body) & 0xFFFFFFFF)
+
+
+def _paeth(a, b, c):
+    p = a + b - c
+    pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+    if pa <= pb and pa <= pc:
+        return a
+    return b if pb <= pc else c
+
+
+def unfilter(raw: bytes, width: int, height: int, bpp: int) -> list:
+    stride = width * bpp
+    rows = []
+    prev = bytearray(stride)
+    pos = 0
+    for _ in range(height):
+        ftype = raw[pos]
+        line = bytearray(raw[pos + 1:pos + 1 + stride])
+        pos += 1 + stride
+        for i in range(stride):
+            a = line[i - bpp] if i >= bpp else 0
+            b = prev[i]
+            c = prev[i - bpp] if i >= bpp else 0
+            if ftype == 1: line[i] = (line[i] + a) & 0xFF
+            elif ftype == 2: line[i] = (line[i] + b) & 0xFF
+            elif ftype == 3: line[i] = (line[i] + ((a + b) >> 1)) & 0xFF
+            elif ftype == 4: line[i] = (line[i] + _paeth(a, b, c)) & 0xFF
+        rows.append(line)
+        prev = line
+    return rows
+
+
+def refilter(rows: list, bpp: int) -> bytes:
+    """Pick the filter per scanline with the minimum-sum-of-absolute-differences heuristic."""
+    out = bytearray()
+    prev = bytearray(len(rows[0])) if rows else bytearray()
+    for line in rows:
+        best = None
+        for ftype in range(5):
+            f = bytearray(len(line))
+            for i in range(len(line)):
+                a = line[i - bpp] if i >= bpp else 0
+                b = prev[i]
+                c = prev[i - bpp] if i >= bpp else 0
+                pred = (0, a, b, (a + b) >> 1, _paeth(a, b, c))[ftype]
+                f[i] = (line[i] - pred) & 0xFF
+            score = sum(v if v < 128 else 256 - v for v in f)
+            if best is None or score < best[0]:
+                best = (score, ftype, f)
+        out.append(best[1])
+        out += best[2]
+        prev = line
+    return bytes(out)
+
+
+def box_resize(rows: list, width: int, height: int, channels: int, new_w: int, new_h: int) -> list:
+    out = []
+    for y in range(new_h):
+        y0, y1 = y * height // new_h, max(y * height // new_h + 1, (y + 1) * height // new_h)
+        line = bytearray(new_w * channels)
+        for x in range(new_w):
+            x0, x1 = x * width // new_w, max(x * width // new_w + 1, (x + 1) * width // new_w)
+            n = (y1 - y0) * (x1 - x0)
+            for ch in range(channels):
+                total = 0
+                for sy in range(y0, y1):
+                    row = rows[sy]
+                    for sx in range(x0, x1):
+                        total += row[sx * channels + ch]
+                line[x * channels + ch] = (total + n // 2) // n
+        out.append(line)
+    return out
+
+
+def optimize_png(data: bytes, target=None) -> bytes:
+    chunks = read_chunks(data)
+    ihdr = chunks[0][1]
+    width, height, depth, color, _, _, interlace = struct.unpack(">IIBBBBB", ihdr)
+    idat = b"".join(body for kind, body in chunks if kind == b"IDAT")
+    kept = [(kind, body) for kind, body in chunks if kind in KEEP_CHUNKS and kind != b"IEND"]
+
+    if depth == 8 and interlace == 0 and color in _CHANNELS:
+        channels = _CHANNELS[color]
+        rows = unfilter(zlib.decompress(idat), width, height, channels)
+        if target:
+            scale = min(1.0, target[0] / width, target[1] / height)
+            new_w = max(1, round(width * scale))
+            new_h = max(1, round(height * scale))
+            if (new_w, new_h) != (width, height):
+                rows = box_resize(rows, width, height, channels, new_w, new_h)
+                width, height = new_w, new_h
+                ihdr = struct.pack(">IIBBBBB", width, height, depth, color, 0, 0, 0)
+                kept[0] = (b"IHDR", ihdr)
+        pixels = refilter(rows, channels)
+    else:
+        # Palette, 16-bit or interlaced: keep the pixel stream, just recompress it
+        pixels = zlib.decompress(idat)
+
+    out = bytearray(PNG_SIGNATURE)
+    for kind, body in kept:
+        out += write_chunk(kind, body)
+    out += write_chunk(b"IDAT", zlib.compress(pixels, 9))
+    out += write_chunk(b"IEND", b"")
+    return bytes(out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--shaders", default=str(ROOT / "shaders"))
+    parser.add_argument("--textures", default=str(ROOT / "textures"))
+    parser.add_argument("--output", default=str(ROOT / "textures_optimized"))
+    args = parser.parse_args()
+
+    textures_dir = Path(args.textures)
+    output_dir = Path(args.output)
+    sizes = find_texture_sizes(Path(args.shaders))
+
+    before = after = 0
+    for source in sorted(sizes):
+        src = textures_dir / source
+        if not src.exists() or src.suffix.lower() != ".png":
+            continue
+        data = src.read_bytes()
+        try:
+            optimized = optimize_png(data, sizes[source])
+        except Exception as e:
+            print(f"Warning: {source}: {e}", file=sys.stderr)
+            continue
+        before += len(data)
+        if len(optimized) >= len(data):
+            after += len(data)
+            print(f"{source}: {len(data)} bytes, kept original")
+            continue
+        after += len(optimized)
+        dst = output_dir / source
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        dst.write_bytes(optimized)
+        print(f"{source}: {len(data)} -> {len(optimized)} bytes ({100.0 * (1 - len(optimized) / len(data)):.1f}% smaller)")
+
+    saved = before - after
+    pct = 100.0 * saved / before if before else 0.0
+    print(f"Total: {before} -> {after} bytes, saved {saved} ({pct:.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
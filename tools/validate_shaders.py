@@ -0,0 +1,61 @@
+"""
+Validate every bundled shader with the same checks the plugin runs before
+activating an effect (utils/validate.py): balanced brackets, techniques with
+passes, resolvable includes and textures, and default parameter values within
+their ui_min/ui_max.
+
+Exits non-zero if any shader fails, so build_release.sh can refuse to ship it.
+
+Usage: python3 tools/validate_shaders.py [--shaders DIR] [--textures DIR]
+"""
+import os
+import sys
+import argparse
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from utils.fx import apply_shader_transformations, parse_shader_text  # noqa: E402
+from utils.validate import validate_effect  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--shaders", default=str(ROOT / "shaders"))
+    parser.add_argument("--textures", default=str(ROOT / "textures"))
+    args = parser.parse_args()
+
+    shaders_dir = Path(args.shaders)
+    checked = 0
+    failed = 0
+    for root, dirs, files in os.walk(shaders_dir, followlinks=True):
+        for f in sorted(files):
+            if not f.endswith(".fx") or f.startswith("."):
+                continue
+            name = (Path(root) / f).relative_to(shaders_dir).as_posix()
+            raw = (Path(root) / f).read_text(encoding="utf-8", errors="replace")
+            text = apply_shader_transformations(raw)
+            try:
+                specs = parse_shader_text(name, raw)
+            except Exception as e:
+                # Parse failures only cost the parameter UI, not the effect itself
+                print(f"Warning: {name}: parameters not parsed: {e}", file=sys.stderr)
+                specs = []
+            warnings = []
+            errors = validate_effect(text, name, [shaders_dir], [args.textures], specs,
+                                     {p.name: p.default for p in specs}, warnings)
+            for w in warnings:
+                print(f"Warning: {name}: {w} (conditional branch)", file=sys.stderr)
+            checked += 1
+            if errors:
+                failed += 1
+                for e in errors:
+                    print(f"{name}: {e}")
+
+    print(f"Validated {checked} shaders, {failed} failed")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from utils.constants import logger
+from utils.state import State
+
+# ---------------------------------------------------------------------------
+# Blocking I/O runs on a small private thread pool so it never stalls
+# Decky's event loop, which is shared with every other plugin.
+# ---------------------------------------------------------------------------
+
+IO_WORKERS = 2
+
+# The loop-lag probe is a diagnostic, off unless enabled through the
+# set_loop_lag_monitor RPC so it doesn't wake the loop on battery for nothing
+LOOP_LAG_INTERVAL = 0.05  # seconds between probes
+LOOP_LAG_THRESHOLD = 0.01  # log when a probe wakes up more than this late
+
+_executor = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="reshadeck-io")
+
+
+async def run_blocking(fn, *args):
+    """Run a blocking function on the I/O pool and await its result."""
+    return await asyncio.get_running_loop().run_in_executor(_executor, fn, *args)
+
+
+async def _loop_lag_monitor():
+    try:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(LOOP_LAG_INTERVAL)
+            lag = time.perf_counter() - start - LOOP_LAG_INTERVAL
+            if lag > LOOP_LAG_THRESHOLD:
+                State.loop_lag_events += 1
+                State.loop_lag_max = max(State.loop_lag_max, lag)
+                logger.warning(f"Event loop blocked for {lag * 1000.0:.1f} ms")
+    except asyncio.CancelledError:
+        pass
+
+
+def start_loop_lag_monitor():
+    if State.loop_lag_task is None:
+        State.loop_lag_task = asyncio.create_task(_loop_lag_monitor())
+
+
+def stop_loop_lag_monitor():
+    if State.loop_lag_task:
+        State.loop_lag_task.cancel()
+        State.loop_lag_task = None
@@ -0,0 +1,129 @@
+import re
+from pathlib import Path
+from utils.constants import destination_folder
+from utils.state import State
+from utils.aio import run_blocking
+
+# ---------------------------------------------------------------------------
+# Shader catalog: {category: set(file names)} for the installed shaders.
+# While the file watcher runs it is kept in State.catalog and updated
+# incrementally; otherwise every call scans the disk.
+# ---------------------------------------------------------------------------
+
+_RE_TEMP = re.compile(r"^.+_[A-Za-z0-9]{6}\.fx$")
+
+
+def _is_listed(name: str) -> bool:
+    return name.endswith(".fx") and not name.startswith(".") and not _RE_TEMP.match(name)
+
+
+def split_catalog_path(rel: str):
+    """Map a path relative to destination_folder to (category, file name), or None."""
+    parts = Path(rel).parts
+    if len(parts) == 1:
+        category, name = "Default", parts[0]
+    elif len(parts) == 2 and not parts[0].startswith("."):
+        category, name = parts[0], parts[1]
+    else:
+        return None
+    if not _is_listed(name):
+        return None
+    return category, name
+
+
+def _scan_category(path: Path) -> set:
+    if not path.exists():
+        return set()
+    return {p.name for p in path.glob("*.fx") if _is_listed(p.name)}
+
+
+def scan_catalog() -> dict:
+    root = Path(destination_folder)
+    catalog = {"Default": _scan_category(root)}
+    if root.exists():
+        for d in root.iterdir():
+            if d.is_dir() and not d.name.startswith(".") and d.name.lower() != "default":
+                catalog[d.name] = _scan_category(d)
+    return catalog
+
+
+def _current() -> dict:
+    return State.catalog if State.catalog is not None else scan_catalog()
+
+
+def catalog_packages() -> list:
+    dirs = [c for c in _current() if c != "Default"]
+    return ["Default"] + sorted(dirs, key=str.lower)
+
+
+def catalog_list(category: str = "Default") -> list:
+    if category == "None":
+        category = "Default"
+    catalog = State.catalog
+    if catalog is not None:
+        names = catalog.get(category, set())
+    elif category == "Default":
+        names = _scan_category(Path(destination_folder))
+    else:
+        names = _scan_category(Path(destination_folder) / category)
+    if category == "Default":
+        return sorted(names, key=str.lower)
+    return sorted((f"{category}/{n}" for n in names), key=str.lower)
+
+
+async def catalog_packages_async() -> list:
+    # The in-memory catalog is owned by the event loop; only disk scans go to the pool
+    if State.catalog is not None:
+        return catalog_packages()
+    return await run_blocking(catalog_packages)
+
+
+async def catalog_list_async(category: str = "Default") -> list:
+    if State.catalog is not None:
+        return catalog_list(category)
+    return await run_blocking(catalog_list, category)
+
+
+def catalog_add(rel: str) -> bool:
+    hit = split_catalog_path(rel)
+    if State.catalog is None or hit is None:
+        return False
+    category, name = hit
+    names = State.catalog.setdefault(category, set())
+    if name in names:
+        return False
+    names.add(name)
+    State.catalog_version += 1
+    return True
+
+
+def catalog_remove(rel: str) -> bool:
+    hit = split_catalog_path(rel)
+    if State.catalog is None or hit is None:
+        return False
+    category, name = hit
+    names = State.catalog.get(category)
+    if not names or name not in names:
+        return False
+    names.discard(name)
+    State.catalog_version += 1
+    return True
+
+
+def scan_package(name: str) -> set:
+    return _scan_category(Path(destination_folder) / name)
+
+
+def catalog_add_package(name: str, names=()):
+    """In-memory only; the file names come from a scan_package() done off the loop."""
+    if State.catalog is None or name.startswith(".") or name.lower() == "default":
+        return
+    State.catalog.setdefault(name, set()).update(names)
+    State.catalog_version += 1
+
+
+def catalog_remove_package(name: str):
+    if State.catalog is None or name not in State.catalog or name == "Default":
+        return
+    del State.catalog[name]
+    State.catalog_version += 1
@@ -0,0 +1,93 @@
+import re
+import json
+from utils.fx import blank_comments_and_strings, content_hash
+from utils.validate import BUILTIN_INCLUDES
+
+# ---------------------------------------------------------------------------
+# Shader chains: several rendered .fx files merged into one effect, so that
+# gamescope compiles and loads a single file for the whole stack.
+#   * each shader's declarations go into their own namespace, so uniforms,
+#     textures, samplers and functions of different shaders can't collide;
+#   * its techniques are renamed after that namespace and stay inside it,
+#     gamescope runs every technique of an effect in declaration order;
+#   * the headers gamescope ships (ReShade.fxh, ...) are hoisted to the top
+#     and emitted once, their declarations are shared by every shader; any
+#     other #include stays where it was inside the shader's namespace, so
+#     it keeps seeing the #defines that precede it;
+#   * macros a shader #defines are #undef'd after its namespace;
+#   * a shader whose rendered text is identical to an earlier one in the
+#     chain (same file, same parameters) is compiled once.
+# Pure text handling, free of decky_plugin like utils/fx.py.
+# ---------------------------------------------------------------------------
+
+CHAIN_NAMESPACE = "Reshadeck_Chain"
+
+_RE_INCLUDE_LINE = re.compile(r'^[ \t]*#[ \t]*include[ \t]+"([^"]+)"[^\n]*\n?', re.MULTILINE)
+_RE_TECHNIQUE_NAME = re.compile(r'\btechnique\s+(\w+)')
+_RE_DEFINE = re.compile(r'^[ \t]*#[ \t]*define[ \t]+(\w+)', re.MULTILINE)
+
+
+def chain_hash(entries: list) -> str:
+    """Cache key for a chain of (shader_name, file stamp, parameters) entries, known before rendering."""
+    h = json.dumps([[name, stamp, params] for name, stamp, params in entries], sort_keys=True, default=str)
+    return content_hash(h.encode("utf-8"))
+
+
+def split_includes(text: str, hoisted=BUILTIN_INCLUDES):
+    """Return (hoisted includes, text without their #include lines); commented-out includes stay."""
+    code = blank_comments_and_strings(text)
+    includes = []
+    out = []
+    pos = 0
+    for m in _RE_INCLUDE_LINE.finditer(text):
+        if m.group(1) not in hoisted or not code[m.start():m.end()].lstrip().startswith("#"):
+            continue
+        includes.append(m.group(1))
+        out.append(text[pos:m.start()])
+        pos = m.end()
+    out.append(text[pos:])
+    return includes, "".join(out)
+
+
+def _rename_techniques(text: str, prefix: str) -> str:
+    code = blank_comments_and_strings(text)
+    out = []
+    pos = 0
+    for m in _RE_TECHNIQUE_NAME.finditer(code):
+        out.append(text[pos:m.start(1)])
+        out.append(f"{prefix}_{m.group(1)}")
+        pos = m.end(1)
+    out.append(text[pos:])
+    return "".join(out)
+
+
+def defined_macros(text: str) -> list:
+    names = []
+    for name in _RE_DEFINE.findall(blank_comments_and_strings(text)):
+        if name not in names:
+            names.append(name)
+    return names
+
+
+def compile_chain(parts: list) -> str:
+    """Merge (shader_name, rendered text) parts, in application order, into one effect."""
+    includes = []
+    sections = []
+    seen = set()
+    for name, text in parts:
+        digest = content_hash(text.encode("utf-8"))
+        if digest in seen:
+            continue
+        seen.add(digest)
+        part_includes, body = split_includes(text)
+        for inc in part_includes:
+            if inc not in includes:
+                includes.append(inc)
+        ns = f"{CHAIN_NAMESPACE}{len(sections)}"
+        body = _rename_techniques(body, ns)
+        undefs = "".join(f"#undef {m}\n" for m in defined_macros(body))
+        sections.append(f"// {name}\nnamespace {ns}\n{{\n{body.strip()}\n}}\n{undefs}")
+
+    header = f"// Reshadeck shader chain: {' -> '.join(name for name, _ in parts)}\n"
+    header += "".join(f'#include "{inc}"\n' for inc in includes)
+    return header + "\n" + "\n".join(sections)
@@ -0,0 +1,74 @@
+import time
+import secrets
+from pathlib import Path
+from utils.constants import logger, destination_folder
+from utils.state import State
+from utils.shader import prepare_effect, set_effect_property, discard_compare_files
+from utils.aio import run_blocking
+
+# ---------------------------------------------------------------------------
+# A/B comparison: both effects are rendered once into persistent files so
+# flipping between them is only an X property swap.
+# ---------------------------------------------------------------------------
+
+
+def _stage_compare_file(shader_name: str, side: str, token: str):
+    if shader_name == "None":
+        return "None"
+    text, errors = prepare_effect(shader_name)
+    if text is None:
+        logger.error(f"Compare: Source {shader_name} not found")
+        return None
+    if errors:
+        logger.error(f"Compare: {shader_name} failed validation: {'; '.join(errors)}")
+        State.validation_errors = errors
+        return None
+    # Random token per session: gamescope caches effects by file name
+    filename = f".reshadeck.compare.{side}.{token}.fx"
+    (Path(destination_folder) / filename).write_text(text, encoding="utf-8")
+    return filename
+
+
+async def start_compare(shader_a: str, shader_b: str) -> bool:
+    await discard_compare_files()
+    token = secrets.token_hex(3)
+    files = {}
+    for side, shader in (("a", shader_a), ("b", shader_b)):
+        f = await run_blocking(_stage_compare_file, shader, side, token)
+        if f is None:
+            State.compare = {"files": files}
+            await discard_compare_files()
+            return False
+        files[side] = f
+    State.compare = {"shaders": {"a": shader_a, "b": shader_b}, "files": files, "side": "a"}
+    State.compare_latencies.clear()
+    logger.info(f"Compare started: A={shader_a} B={shader_b}")
+    return await set_effect_property(files["a"])
+
+
+async def toggle_compare():
+    """Flip to the other side. Returns the shown side and the swap latency in ms."""
+    if not State.compare:
+        return None
+    side = "b" if State.compare["side"] == "a" else "a"
+    start = time.perf_counter()
+    ok = await set_effect_property(State.compare["files"][side])
+    latency_ms = (time.perf_counter() - start) * 1000.0
+    if ok:
+        State.compare["side"] = side
+        State.compare_latencies.append(latency_ms)
+    logger.info(f"Compare toggled to {side} in {latency_ms:.1f} ms")
+    return {"side": State.compare["side"], "shader": State.compare["shaders"][State.compare["side"]], "latency_ms": latency_ms}
+
+
+def compare_stats() -> dict:
+    samples = sorted(State.compare_latencies)
+    if not samples:
+        return {"count": 0}
+    return {
+        "count": len(samples),
+        "mean_ms": sum(samples) / len(samples),
+        "p50_ms": samples[len(samples) // 2],
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        "max_ms": samples[-1],
+    }
@@ -1,68 +1,89 @@
 import os
 import json
+import asyncio
 from pathlib import Path
-from utils.constants import config_file, logger
+from utils.constants import config_file, journal_file, logger
 from utils.state import State
+from utils.aio import run_blocking
+from utils.journal import append_record, read_records, clear_journal
 
 def config_key():
     return State.current_appid if State.per_game_mode else "_global"
 
-def save_config_immediate():
-    """Consolidated save logic."""
-    try:
-        Path(os.path.dirname(config_file)).mkdir(parents=True, exist_ok=True)
-        data = {}
-        if os.path.exists(config_file):
-            try:
-                with open(config_file, "r") as f:
-                    data = json.load(f)
-            except Exception:
-                data = {}
+def shader_category(shader_name: str) -> str:
+    """Catalog category of a shader name, e.g. "CRT" for "CRT/CRTGeom.fx"."""
+    return shader_name.split("/", 1)[0] if "/" in shader_name else "Default"
 
-        key = config_key()
-        
-        shaders = []
-        if State.active_shader != "None":
+def _profile_patch() -> dict:
+    """
+    The config changes that persist the in-memory profile: keys to set,
+    per-app fields to merge. A snapshot, safe to hand to the I/O pool.
+    """
+    key = config_key()
+    
+    shaders = []
+    if State.active_shader != "None":
+        shaders.append({
+            "shader": State.active_shader,
+            "category": State.active_category,
+            "parameters": dict(State.shader_parameters.get(State.active_shader, {}))
+        })
+        for shader in State.chained_shaders:
+            if shader == "None" or shader == State.active_shader:
+                continue
             shaders.append({
-                "shader": State.active_shader,
-                "category": State.active_category,
-                "parameters": State.shader_parameters.get(State.active_shader, {})
+                "shader": shader,
+                "category": shader_category(shader),
+                "parameters": dict(State.shader_parameters.get(shader, {}))
             })
 
-        entry = {
-            "appname": State.appname if State.per_game_mode else "Global",
-            "active_category": State.active_category,
-            "shaders": shaders,
-        }
-        if State.per_game_mode:
-            entry["per_game"] = True
-        data[key] = entry
-        
-        data["master_enabled"] = State.master_switch
+    entry = {
+        "appname": State.appname if State.per_game_mode else "Global",
+        "active_category": State.active_category,
+        "shaders": shaders,
+    }
+    if State.battery_shader != "None":
+        entry["battery_shader"] = State.battery_shader
+    if State.per_game_mode:
+        entry["per_game"] = True
 
-        if State.per_game_mode and key == State.current_appid:
-            if State.current_appid not in data or not isinstance(data[State.current_appid], dict):
-                 data[State.current_appid] = {}
-            data[State.current_appid]["per_game"] = True
+    patch = {
+        "set": {
+            key: entry,
+            "master_enabled": State.master_switch,
+            "install_mode": State.install_mode,
+            "live_reload": State.live_reload,
+        },
+        "merge": {},
+    }
+    if not State.per_game_mode:
+        patch["merge"][State.current_appid] = {"per_game": False, "appname": State.appname}
+    return patch
 
-        if not State.per_game_mode:
-            if State.current_appid not in data:
-                data[State.current_appid] = {}
-            data[State.current_appid]["per_game"] = False
-            data[State.current_appid]["appname"] = State.appname
+def apply_patch(data: dict, patch: dict) -> dict:
+    data.update(patch.get("set", {}))
+    for appid, fields in patch.get("merge", {}).items():
+        if not isinstance(data.get(appid), dict):
+            data[appid] = {}
+        data[appid].update(fields)
+    return data
 
-        with open(config_file, "w") as f:
-            json.dump(data, f, indent=4)
+def save_config_immediate(patch: dict = None):
+    """Consolidated save logic: one journal append, compacted into config.json later."""
+    try:
+        append_record(journal_file, patch if patch is not None else _profile_patch())
     except Exception as e:
         logger.error(f"Failed to write config: {e}")
 
-def load_config_state(appid: str):
-    """Load state from file into memory based on appid."""
+def disable_per_game(appid: str):
+    """Mark appid as following the global profile, keeping its stored profile."""
+    append_record(journal_file, {"merge": {appid: {"per_game": False}}})
+
+def apply_config_state(data: dict, appid: str):
+    """Load the profile in effect for appid from an already read config into memory."""
     try:
-        if not os.path.exists(config_file):
+        if not data:
             return
-        with open(config_file, "r") as f:
-            data = json.load(f)
 
         app_config = data.get(appid, {})
         is_per_game = app_config.get("per_game", False)
@@ -71,10 +92,14 @@ def load_config_state(appid: str):
         config = app_config if is_per_game else data.get("_global", {})
 
         State.master_switch = data.get("master_enabled", True)
+        State.install_mode = data.get("install_mode", "lazy")
+        State.live_reload = data.get("live_reload", False)
         
         State.active_category = config.get("active_category", "Default")
+        State.battery_shader = config.get("battery_shader", "None")
         
         shaders = config.get("shaders", [])
+        State.chained_shaders = []
         if shaders and isinstance(shaders, list) and len(shaders) > 0:
             first_pass = shaders[0]
             State.active_shader = first_pass.get("shader", "None")
@@ -82,9 +107,181 @@ def load_config_state(appid: str):
                 State.active_category = first_pass.get("category", State.active_category)
             # Convert to dictionary keyed by shader name as expected by the rest of the application
             State.shader_parameters = {State.active_shader: first_pass.get("parameters", {})} if State.active_shader != "None" else {}
+            # Later passes are chained after the first one (utils/chain.py)
+            for chained in shaders[1:] if State.active_shader != "None" else []:
+                name = chained.get("shader", "None") if isinstance(chained, dict) else "None"
+                if name == "None" or name == State.active_shader or name in State.chained_shaders:
+                    continue
+                State.chained_shaders.append(name)
+                State.shader_parameters[name] = chained.get("parameters", {})
         else:
             State.active_shader = "None"
             State.shader_parameters = {}
             
     except Exception as e:
         logger.error(f"Failed to read config: {e}")
+
+def _read_base() -> dict:
+    try:
+        if os.path.exists(config_file):
+            with open(config_file, "r") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                return data
+    except Exception as e:
+        logger.error(f"Failed to read config: {e}")
+    return {}
+
+def read_config() -> dict:
+    """Read the whole config store with the journal replayed on top, {} if missing or unreadable."""
+    data = _read_base()
+    for record in read_records(journal_file):
+        apply_patch(data, record)
+    return data
+
+def write_config(data: dict) -> bool:
+    """Atomically replace config.json with data; the journal is folded in and cleared."""
+    try:
+        Path(os.path.dirname(config_file)).mkdir(parents=True, exist_ok=True)
+        tmp = config_file + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, config_file)
+        clear_journal(journal_file)
+        return True
+    except Exception as e:
+        logger.error(f"Failed to write config: {e}")
+        return False
+
+def delete_config():
+    """Remove config.json and its journal; raises if either can't be removed."""
+    for path in (config_file, journal_file):
+        if os.path.exists(path):
+            os.remove(path)
+
+def compact_journal() -> bool:
+    """Fold pending journal records into config.json. Returns True if there were any."""
+    if not os.path.exists(journal_file):
+        return False
+    return write_config(read_config())
+
+# ---------------------------------------------------------------------------
+# Bulk profile operations: one read and one write for any number of appids
+# ---------------------------------------------------------------------------
+
+_RESERVED_KEYS = ("_global", "master_enabled", "install_mode", "live_reload")
+
+def _app_keys(appids) -> list:
+    keys = []
+    for appid in appids or []:
+        appid = str(appid)
+        if appid and appid not in _RESERVED_KEYS and appid not in keys:
+            keys.append(appid)
+    return keys
+
+def _profile_entry(data: dict, appid: str, shaders: list, category: str) -> dict:
+    previous = data.get(appid) if isinstance(data.get(appid), dict) else {}
+    return {
+        "appname": previous.get("appname", appid),
+        "active_category": category,
+        "shaders": json.loads(json.dumps(shaders)),
+        "per_game": True,
+    }
+
+def _effective_profile(data: dict, appid: str) -> dict:
+    app_config = data.get(appid, {})
+    if isinstance(app_config, dict) and app_config.get("per_game", False):
+        return app_config
+    return data.get("_global", {})
+
+def copy_profile(source_appid: str, appids: list) -> list:
+    """Copy the profile in effect for source_appid to every appid as a per-game profile."""
+    appids = _app_keys(appids)
+    data = read_config()
+    source = _effective_profile(data, source_appid)
+    shaders = source.get("shaders", [])
+    category = source.get("active_category", "Default")
+    changed = [a for a in appids if a != source_appid]
+    for appid in changed:
+        data[appid] = _profile_entry(data, appid, shaders, category)
+        if "battery_shader" in source:
+            data[appid]["battery_shader"] = source["battery_shader"]
+    if changed and not write_config(data):
+        return []
+    return changed
+
+def assign_profile(appids: list, shader: str, category: str = "Default", parameters: dict = None) -> list:
+    """Give every appid a per-game profile using shader with parameters."""
+    appids = _app_keys(appids)
+    data = read_config()
+    shaders = []
+    if shader != "None":
+        shaders.append({"shader": shader, "category": category, "parameters": parameters or {}})
+    for appid in appids:
+        data[appid] = _profile_entry(data, appid, shaders, category)
+    if appids and not write_config(data):
+        return []
+    return list(appids)
+
+def clear_profiles(appids: list) -> list:
+    """Drop per-game overrides so every appid falls back to the global profile."""
+    appids = _app_keys(appids)
+    data = read_config()
+    changed = []
+    for appid in appids:
+        entry = data.get(appid)
+        if not isinstance(entry, dict):
+            continue
+        data[appid] = {"per_game": False, "appname": entry.get("appname", appid)}
+        changed.append(appid)
+    if changed and not write_config(data):
+        return []
+    return changed
+
+# ---------------------------------------------------------------------------
+# Async wrappers: config I/O runs on the I/O pool, serialized by one lock.
+# Saves only append to the journal; a background task compacts it.
+# ---------------------------------------------------------------------------
+
+JOURNAL_COMPACT_INTERVAL = 30.0  # seconds between compactions of the config journal
+
+_config_lock = asyncio.Lock()
+
+async def run_config_op(fn, *args):
+    async with _config_lock:
+        return await run_blocking(fn, *args)
+
+async def save_config():
+    # Snapshot State on the loop before awaiting: handlers that run while the
+    # save waits for the lock must not leak into it (e.g. a game switch)
+    await run_config_op(save_config_immediate, _profile_patch())
+
+async def load_config(appid: str):
+    # Only the read runs on the I/O pool, State is updated on the loop
+    data = await run_config_op(read_config)
+    apply_config_state(data, appid)
+
+async def compact_config():
+    return await run_config_op(compact_journal)
+
+async def _compact_periodically():
+    try:
+        while True:
+            await asyncio.sleep(JOURNAL_COMPACT_INTERVAL)
+            if await compact_config():
+                logger.debug("Config journal compacted")
+    except asyncio.CancelledError:
+        pass
+    except Exception as e:
+        logger.error(f"Error in config compaction: {e}")
+
+def start_config_compactor():
+    if State.journal_task is None:
+        State.journal_task = asyncio.create_task(_compact_periodically())
+
+def stop_config_compactor():
+    if State.journal_task:
+        State.journal_task.cancel()
+        State.journal_task = None
@@ -4,7 +4,13 @@ logger = decky_plugin.logger
 
 destination_folder = decky_plugin.DECKY_USER_HOME + "/.local/share/gamescope/reshade/Shaders"
 textures_destination = decky_plugin.DECKY_USER_HOME + "/.local/share/gamescope/reshade/Textures"
+system_shaders_folder = "/usr/share/gamescope/reshade/Shaders"
+system_textures_folder = "/usr/share/gamescope/reshade/Textures"
 shaders_folder = decky_plugin.DECKY_PLUGIN_DIR + "/shaders"
 textures_folder = decky_plugin.DECKY_PLUGIN_DIR + "/textures"
+optimized_textures_folder = decky_plugin.DECKY_PLUGIN_DIR + "/textures_optimized"
 config_file = decky_plugin.DECKY_PLUGIN_SETTINGS_DIR + "/config.json"
+journal_file = decky_plugin.DECKY_PLUGIN_SETTINGS_DIR + "/config.journal"
 crash_file = decky_plugin.DECKY_PLUGIN_SETTINGS_DIR + "/crash.json"
+manifest_file = decky_plugin.DECKY_PLUGIN_DIR + "/shader_manifest.json"
+power_supply_root = "/sys/class/power_supply"
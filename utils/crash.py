@@ -6,7 +6,10 @@ from pathlib import Path
 from utils.constants import logger, crash_file
 from utils.state import State
 from utils.shader import apply_shader_internal
-from utils.config import save_config_immediate
+from utils.config import save_config
+from utils.aio import run_blocking
+
+COREDUMP_PATH = Path("/var/lib/systemd/coredump")
 
 def read_crash_data():
     try:
@@ -25,13 +28,26 @@ def write_crash_data(count: int, last_timestamp: str):
     except Exception:
         pass
 
+def clear_crash_data():
+    if os.path.exists(crash_file):
+        os.remove(crash_file)
+
+def latest_coredump():
+    """Return (file, mtime) of the newest gamescope coredump, or None."""
+    if not COREDUMP_PATH.exists():
+        return None
+    files = list(COREDUMP_PATH.glob("core.gamescope-wl.*.zst"))
+    if not files:
+        return None
+    latest_file = max(files, key=os.path.getmtime)
+    return latest_file, latest_file.stat().st_mtime
+
 async def crash_detection_subroutine():
     """
     Managed asyncio.Task that lives for precisely 60 seconds.
     Looks for gamescope coredumps and instantly kills shaders if found.
     """
     start_time = time.time()
-    coredump_path = Path("/var/lib/systemd/coredump")
     
     logger.info("Crash Detection Subroutine started (60s window).")
     
@@ -39,26 +55,21 @@ async def crash_detection_subroutine():
         while (time.time() - start_time) < 60:
             await asyncio.sleep(2.0)
             
-            if not coredump_path.exists():
+            latest = await run_blocking(latest_coredump)
+            if latest is None:
                 continue
-                
-            files = list(coredump_path.glob("core.gamescope-wl.*.zst"))
-            if not files:
-                continue
-                
-            latest_file = max(files, key=os.path.getmtime)
-            latest_timestamp = latest_file.stat().st_mtime
+            latest_file, latest_timestamp = latest
             
             if latest_timestamp > start_time:
                 logger.error(f"NEW CRASH DETECTED. File: {latest_file.name}. Disabling shaders.")
                 
                 State.master_switch = False
                 State.crash_detected = True
-                save_config_immediate()
+                await save_config()
                 await apply_shader_internal("None")
                 
                 # Record the crash timestamp so we don't trip on it at startup
-                write_crash_data(1, str(latest_timestamp))
+                await run_blocking(write_crash_data, 1, str(latest_timestamp))
                 
                 return # Exit subroutine
                 
@@ -0,0 +1,198 @@
+import re
+import hashlib
+from pathlib import Path
+from utils.params import ParamSpec
+
+# Pure .fx text handling. Nothing here may import decky_plugin so that the
+# build tooling (tools/build_shader_manifest.py) can reuse it.
+
+# Format of the build-time manifest, shared by the builder and utils/manifest.py
+MANIFEST_VERSION = 2  # 2: ParamSpec.ui_range_implicit
+
+# ---------------------------------------------------------------------------
+# Regex patterns for parsing .fx uniform parameters
+# ---------------------------------------------------------------------------
+
+_RE_ANNOTATED = re.compile(
+    r"uniform\s+(float|bool|int)\s+(\w+)\s*<\s*([^>]*)\s*>\s*=\s*(.*?)\s*;",
+    re.DOTALL,
+)
+
+_RE_PLAIN = re.compile(
+    r"uniform\s+(float|bool|int)\s+(\w+)\s*=\s*([-+]?\d+\.?\d*)\s*;",
+)
+
+_RE_UI = {
+    "ui_type":  re.compile(r'ui_type\s*=\s*"(\w+)"'),
+    "ui_min":   re.compile(r'ui_min\s*=\s*([-+]?\d+\.?\d*)'),
+    "ui_max":   re.compile(r'ui_max\s*=\s*([-+]?\d+\.?\d*)'),
+    "ui_step":  re.compile(r'ui_step\s*=\s*([-+]?\d+\.?\d*)'),
+    "ui_label": re.compile(r'ui_label\s*=\s*"([^"]*)"'),
+}
+
+_RE_UI_ITEMS = re.compile(r'ui_items\s*=\s*"((?:[^"\\]|\\0)*)"')
+
+_RE_SOURCE = re.compile(r'source\s*=\s*"')
+
+_RE_COMMENT_OR_STRING = re.compile(r'//[^\n]*|/\*.*?\*/|"(?:[^"\\\n]|\\.)*"', re.DOTALL)
+
+def apply_shader_transformations(text: str) -> str:
+    """Transforms upstream .fx files to be compatible by injecting UI annotations."""
+    # Remove the ReShadeUI include as it's not needed/causes errors if missing
+    text = re.sub(r'#include "ReShadeUI\.fxh"', "", text)
+    
+    # Transform different uniform types
+    # 1. Sliders (FLOAT/INT) -> ui_type = "drag"
+    text = re.sub(r'<\s*__UNIFORM_SLIDER_(?:FLOAT|INT)[1-3]', r'<\n    ui_type = "drag";', text)
+    
+    # 2. Colors -> ui_type = "color"
+    text = re.sub(r'<\s*__UNIFORM_COLOR_FLOAT[1-3]', r'< ui_type = "color";', text)
+    
+    # 3. Combos -> ui_type = "combo"
+    text = re.sub(r'<\s*__UNIFORM_COMBO_INT1', r'<\n    ui_type = "combo";', text)
+    
+    # 4. Inputs/Drags (BOOL/Drag Float) -> ui_type = "drag"
+    text = re.sub(r'<\s*__UNIFORM_INPUT_BOOL1', r'<\n    ui_type = "drag";', text)
+    text = re.sub(r'<\s*__UNIFORM_DRAG_FLOAT[1-2]', r'<\n    ui_type = "drag";', text)
+    
+    return text
+
+_RE_INCLUDE = re.compile(r'^\s*#\s*include\s+"([^"]+)"', re.MULTILINE)
+_RE_TEXTURE_SOURCE = re.compile(r'\btexture\s+\w+\s*<[^>]*?\bsource\s*=\s*"([^"]+)"', re.DOTALL)
+
+
+def parse_shader_text(shader_name: str, text: str) -> list[ParamSpec]:
+    """Parse all user-tuneable uniform parameters from .fx source text."""
+    text = apply_shader_transformations(text)
+    base = shader_name.replace(".fx", "")
+        
+    params: list[ParamSpec] = []
+    # --- annotated uniforms ---
+    for m in _RE_ANNOTATED.finditer(text):
+        utype, uname, annotation, raw_default = (
+            m.group(1), m.group(2), m.group(3), m.group(4).strip()
+        )
+        if _RE_SOURCE.search(annotation):
+            continue
+
+        ui: dict = {}
+        for key, pat in _RE_UI.items():
+            hit = pat.search(annotation)
+            if hit:
+                ui[key] = hit.group(1)
+
+        items_hit = _RE_UI_ITEMS.search(annotation)
+        if items_hit:
+            raw_items = items_hit.group(1)
+            ui["ui_items"] = [s for s in raw_items.split("\\0") if s]
+
+        if utype == "float":
+            default = float(raw_default)
+        elif utype == "bool":
+            default = raw_default.lower() == "true"
+        elif utype == "int":
+            default = int(raw_default)
+        else:
+            default = raw_default
+
+        for k in ("ui_min", "ui_max", "ui_step"):
+            if k in ui:
+                ui[k] = float(ui[k])
+
+        if "ui_label" not in ui:
+            ui["ui_label"] = f"{uname} [{base}]"
+
+        params.append(ParamSpec(uname, utype, default, **ui))
+
+    # --- plain uniforms (CAS-style, no annotation block) ---
+    annotated_names = {p.name for p in params}
+    for m in _RE_PLAIN.finditer(text):
+        utype, uname, raw_default = m.group(1), m.group(2), m.group(3)
+        if uname in annotated_names:
+            continue
+        line_start = text.rfind("\n", 0, m.start()) + 1
+        preceding = text[line_start:m.start()]
+        if "<" in preceding:
+            continue
+        if uname.lower() in ("iglobaltime", "framecount", "fcount"):
+            continue
+
+        params.append(ParamSpec(
+            uname,
+            utype,
+            float(raw_default) if utype == "float" else int(raw_default),
+            ui_type="drag",
+            ui_min=0.0,
+            ui_max=2.0,
+            ui_step=0.01,
+            ui_label=f"{uname} [{base}]",
+            ui_range_implicit=True,
+        ))
+
+    return params
+
+
+def blank_comments_and_strings(text: str) -> str:
+    """Blank out comments and string literals, keeping offsets and newlines."""
+    return _RE_COMMENT_OR_STRING.sub(lambda m: re.sub(r"[^\n]", " ", m.group(0)), text)
+
+
+def blank_comments(text: str) -> str:
+    """Blank out comments only, keeping string literals, offsets and newlines."""
+    return _RE_COMMENT_OR_STRING.sub(
+        lambda m: m.group(0) if m.group(0).startswith('"') else re.sub(r"[^\n]", " ", m.group(0)), text)
+
+
+def find_includes(text: str) -> list:
+    return _RE_INCLUDE.findall(text)
+
+
+def find_texture_sources(text: str) -> list:
+    return _RE_TEXTURE_SOURCE.findall(text)
+
+
+def _resolve_include(name: str, including_dir: Path, root: Path):
+    """Resolve an include the same way ReShade does: relative first, then the root."""
+    for base in (including_dir, root):
+        candidate = base / name
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def resolve_dependencies(shader_name: str, text: str, root: Path):
+    """
+    Return (includes, textures) referenced by a shader, as paths relative to
+    the shaders root and the textures root respectively. Includes are
+    followed recursively through the headers found under root.
+    """
+    includes: list[str] = []
+    textures: list[str] = []
+    pending = [(Path(shader_name).parent, text)]
+    seen = set()
+
+    while pending:
+        rel_dir, content = pending.pop()
+        for tex in _RE_TEXTURE_SOURCE.findall(content):
+            if tex not in textures:
+                textures.append(tex)
+        for inc in _RE_INCLUDE.findall(content):
+            src = _resolve_include(inc, root / rel_dir, root)
+            if src is None:
+                continue
+            rel = src.relative_to(root).as_posix()
+            if rel in seen:
+                continue
+            seen.add(rel)
+            includes.append(rel)
+            try:
+                pending.append((Path(rel).parent, src.read_text(encoding="utf-8", errors="replace")))
+            except Exception:
+                pass
+
+    return includes, textures
+
+
+def content_hash(data: bytes) -> str:
+    """Hash used to match shader files against the bundled metadata manifest."""
+    return hashlib.sha1(data).hexdigest()
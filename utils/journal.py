@@ -0,0 +1,61 @@
+import os
+import json
+from pathlib import Path
+from utils.constants import logger
+
+# ---------------------------------------------------------------------------
+# Append-only JSON-lines journal. Each record is written with one append and
+# an fsync, so a power loss can at worst cut off the record being written;
+# readers drop a torn last line instead of failing.
+# ---------------------------------------------------------------------------
+
+
+def append_record(path: str, record: dict) -> bool:
+    line = json.dumps(record, separators=(",", ":")) + "\n"
+    try:
+        Path(os.path.dirname(path)).mkdir(parents=True, exist_ok=True)
+        fd = os.open(path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            size = os.fstat(fd).st_size
+            if size and os.pread(fd, 1, size - 1) != b"\n":
+                line = "\n" + line  # don't glue onto a record torn by a power loss
+            os.write(fd, line.encode("utf-8"))
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        return True
+    except Exception as e:
+        logger.error(f"Failed to append to journal {path}: {e}")
+        return False
+
+
+def read_records(path: str) -> list:
+    """All complete records, in order. Unparseable lines are skipped."""
+    records = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for n, line in enumerate(f, 1):
+                if not line.endswith("\n"):
+                    logger.warning(f"Journal {path}: dropping incomplete record at line {n}")
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    logger.warning(f"Journal {path}: skipping corrupt record at line {n}")
+                    continue
+                if isinstance(record, dict):
+                    records.append(record)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.error(f"Failed to read journal {path}: {e}")
+    return records
+
+
+def clear_journal(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.error(f"Failed to clear journal {path}: {e}")
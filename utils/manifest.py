@@ -0,0 +1,62 @@
+import json
+from pathlib import Path
+from utils.constants import logger, shaders_folder, manifest_file
+from utils.state import State
+from utils.params import ParamSpec
+from utils.fx import content_hash, MANIFEST_VERSION
+
+# ---------------------------------------------------------------------------
+# Build-time shader metadata manifest (see tools/build_shader_manifest.py)
+#
+# {"version": 2, "shaders": {"CRT/CRTGeom.fx": {"hash": ..., "params": [...],
+#                                             "includes": [...], "textures": [...]}}}
+# ---------------------------------------------------------------------------
+
+_verified = {}  # {shader_name: ((mtime_ns, size), entry or None)}
+
+
+def _load_manifest() -> dict:
+    if State.shader_manifest is None:
+        State.shader_manifest = {}
+        try:
+            if Path(manifest_file).exists():
+                with open(manifest_file, "r") as f:
+                    data = json.load(f)
+                if data.get("version") == MANIFEST_VERSION:
+                    State.shader_manifest = data.get("shaders", {})
+                    logger.info(f"Loaded shader manifest ({len(State.shader_manifest)} shaders)")
+        except Exception as e:
+            logger.error(f"Failed to load shader manifest: {e}")
+    return State.shader_manifest
+
+
+def manifest_entry(shader_name: str):
+    """
+    Return the manifest entry for a bundled shader if the file on disk still
+    hashes to what was recorded at build time, else None.
+    """
+    manifest = _load_manifest()
+    entry = manifest.get(shader_name)
+    if entry is None:
+        return None
+    fx_file = Path(shaders_folder) / shader_name
+    try:
+        st = fx_file.stat()
+    except OSError:
+        return None
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _verified.get(shader_name)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    if content_hash(fx_file.read_bytes()) != entry.get("hash"):
+        entry = None
+    _verified[shader_name] = (stamp, entry)
+    return entry
+
+
+def manifest_params(shader_name: str):
+    """ParamSpecs from the manifest, or None if the shader must be parsed live."""
+    entry = manifest_entry(shader_name)
+    if entry is None:
+        return None
+    return [ParamSpec(**p) for p in entry.get("params", [])]
@@ -0,0 +1,117 @@
+import sys
+import threading
+from collections import OrderedDict
+
+# ---------------------------------------------------------------------------
+# Compact parameter metadata
+# ---------------------------------------------------------------------------
+
+PARAMS_CACHE_SIZE = 64
+
+_OPTIONAL_FIELDS = ("ui_type", "ui_min", "ui_max", "ui_step", "ui_label", "ui_items", "ui_range_implicit")
+
+
+class ParamSpec:
+    """One user-tuneable uniform parsed from a .fx file."""
+    __slots__ = ("name", "type", "default", "ui_type", "ui_min", "ui_max", "ui_step", "ui_label", "ui_items",
+                 "ui_range_implicit")
+
+    def __init__(self, name: str, type: str, default, ui_type=None, ui_min=None,
+                 ui_max=None, ui_step=None, ui_label=None, ui_items=None, ui_range_implicit=None):
+        self.name = sys.intern(name)
+        self.type = sys.intern(type)
+        self.default = default
+        self.ui_type = sys.intern(ui_type) if ui_type is not None else None
+        self.ui_min = ui_min
+        self.ui_max = ui_max
+        self.ui_step = ui_step
+        self.ui_label = sys.intern(ui_label) if ui_label is not None else None
+        self.ui_items = tuple(sys.intern(i) for i in ui_items) if ui_items else None
+        # ui_min/ui_max made up for a plain uniform: a slider hint, not a limit
+        self.ui_range_implicit = True if ui_range_implicit else None
+
+    def coerce(self, value):
+        """Convert a value coming from the UI to this parameter's type."""
+        if self.type == "float": return float(value)
+        if self.type == "bool": return bool(value)
+        if self.type == "int": return int(value)
+        return value
+
+    def to_dict(self, value=None) -> dict:
+        """Serialize for the frontend, omitting annotations the shader didn't set."""
+        d = {"name": self.name, "type": self.type, "default": self.default}
+        for k in _OPTIONAL_FIELDS:
+            v = getattr(self, k)
+            if v is not None:
+                d[k] = list(v) if k == "ui_items" else v
+        if value is not None:
+            d["value"] = value
+        return d
+
+
+class ShaderParams:
+    """All parameters of one shader with O(1) lookup by name."""
+    __slots__ = ("specs", "index", "stamp")
+
+    def __init__(self, specs: list, stamp=None):
+        self.specs = tuple(specs)
+        self.index = {p.name: i for i, p in enumerate(self.specs)}
+        self.stamp = stamp
+
+    def __iter__(self):
+        return iter(self.specs)
+
+    def __len__(self):
+        return len(self.specs)
+
+    def get(self, name: str):
+        i = self.index.get(name)
+        return self.specs[i] if i is not None else None
+
+    def defaults(self) -> dict:
+        return {p.name: p.default for p in self.specs}
+
+
+class ParamsCache:
+    """LRU-bounded cache of ShaderParams keyed by shader name (thread-safe)."""
+
+    def __init__(self, maxsize: int = PARAMS_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, shader_name: str, stamp=None):
+        with self._lock:
+            entry = self._data.get(shader_name)
+            if entry is None or (stamp is not None and entry.stamp != stamp):
+                self.misses += 1
+                return None
+            self._data.move_to_end(shader_name)
+            self.hits += 1
+            return entry
+
+    def put(self, shader_name: str, entry: ShaderParams):
+        with self._lock:
+            self._data[shader_name] = entry
+            self._data.move_to_end(shader_name)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, shader_name: str):
+        with self._lock:
+            return self._data.pop(shader_name, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, shader_name: str):
+        return shader_name in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,84 @@
+import asyncio
+from pathlib import Path
+from utils.constants import logger, power_supply_root
+from utils.state import State
+from utils.aio import run_blocking
+
+# ---------------------------------------------------------------------------
+# Battery-aware shader downgrade: while on battery, a profile's
+# battery_shader is applied in place of its active shader.
+# ---------------------------------------------------------------------------
+
+POWER_POLL_INTERVAL = 5.0  # seconds between sysfs reads
+POWER_DEBOUNCE = 15.0  # a new power state must hold this long before switching
+
+
+def _read(path: Path) -> str:
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return ""
+
+
+def read_on_battery(root: str = None) -> bool:
+    """
+    True when running from battery. Any online Mains/USB supply counts as AC;
+    without one, a discharging battery means battery. No battery means AC.
+    """
+    base = Path(root or State.power_supply_root or power_supply_root)
+    if not base.exists():
+        return False
+    discharging = False
+    for supply in base.iterdir():
+        kind = _read(supply / "type")
+        if kind in ("Mains", "USB") and _read(supply / "online") == "1":
+            return False
+        if kind == "Battery" and _read(supply / "status") == "Discharging":
+            discharging = True
+    return discharging
+
+
+def effective_shader(shader_name: str) -> str:
+    """The shader to actually apply for shader_name given the power state."""
+    if (State.on_battery and shader_name != "None" and shader_name == State.active_shader
+            and State.battery_shader != "None"):
+        return State.battery_shader
+    return shader_name
+
+
+async def _power_watch(on_change):
+    pending = None
+    pending_since = 0.0
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            try:
+                on_battery = await run_blocking(read_on_battery)
+                if on_battery == State.on_battery:
+                    pending = None
+                elif pending != on_battery:
+                    pending, pending_since = on_battery, loop.time()
+                elif loop.time() - pending_since >= POWER_DEBOUNCE:
+                    pending = None
+                    State.on_battery = on_battery
+                    logger.info(f"Power source changed: {'battery' if on_battery else 'AC'}")
+                    await on_change()
+            except Exception as e:
+                # Keep polling, a single failed read or apply must not end the watch
+                logger.error(f"Error in power watcher: {e}")
+            await asyncio.sleep(POWER_POLL_INTERVAL)
+    except asyncio.CancelledError:
+        pass
+
+
+async def start_power_watcher(on_change):
+    if State.power_task is not None:
+        return
+    State.on_battery = await run_blocking(read_on_battery)
+    State.power_task = asyncio.create_task(_power_watch(on_change))
+
+
+def stop_power_watcher():
+    if State.power_task:
+        State.power_task.cancel()
+        State.power_task = None
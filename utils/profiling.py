@@ -0,0 +1,169 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import inspect
+import builtins
+import functools
+import contextlib
+import decky_plugin
+
+# ---------------------------------------------------------------------------
+# Opt-in startup profiling: per-module import times, startup phase timings
+# and the time from process start to the first RPC served. Enabled by the
+# marker file below (see Plugin.set_startup_profiling), takes effect on the
+# next plugin load. main.py imports this module first, so it may only use
+# the standard library and decky_plugin, and keeps its own state instead of
+# State (importing utils.state is part of what gets measured).
+# ---------------------------------------------------------------------------
+
+profile_marker = decky_plugin.DECKY_PLUGIN_SETTINGS_DIR + "/profile_startup"
+profile_report = decky_plugin.DECKY_PLUGIN_SETTINGS_DIR + "/startup_profile.json"
+
+_enabled = os.path.exists(profile_marker)
+_imports = {}  # {module: [cumulative seconds, self seconds]}
+_phases = []  # [(name, start, duration)] relative to the profiling epoch
+_first_rpc = None  # (name, at)
+_report_task = None  # pending report write started by the first RPC
+_epoch = time.perf_counter()
+_epoch_wall = time.time()
+_real_import = builtins.__import__
+_stack = []  # child import time accumulated per frame of nested imports
+
+
+def startup_profiling_enabled() -> bool:
+    return _enabled
+
+
+def _process_start() -> float:
+    """Wall clock time the process started, from /proc; None if unavailable."""
+    try:
+        with open("/proc/self/stat", "r") as f:
+            # Field 22 (starttime) counted after the parenthesized command name
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/stat", "r") as f:
+            btime = next(int(line.split()[1]) for line in f if line.startswith("btime"))
+        return btime + start_ticks / os.sysconf("SC_CLK_TCK")
+    except Exception:
+        return None
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    if level or name in sys.modules:
+        return _real_import(name, globals, locals, fromlist, level)
+    _stack.append(0.0)
+    start = time.perf_counter()
+    try:
+        return _real_import(name, globals, locals, fromlist, level)
+    finally:
+        elapsed = time.perf_counter() - start
+        children = _stack.pop()
+        if _stack:
+            _stack[-1] += elapsed
+        entry = _imports.setdefault(name, [0.0, 0.0])
+        entry[0] += elapsed
+        entry[1] += elapsed - children
+
+
+def start_import_profiling():
+    if _enabled and builtins.__import__ is _real_import:
+        builtins.__import__ = _timed_import
+
+
+def stop_import_profiling():
+    if builtins.__import__ is _timed_import:
+        builtins.__import__ = _real_import
+        _phases.append(("imports", 0.0, time.perf_counter() - _epoch))
+
+
+@contextlib.contextmanager
+def startup_phase(name: str):
+    """Time a block of startup work; a no-op unless profiling is enabled."""
+    if not _enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _phases.append((name, start - _epoch, time.perf_counter() - start))
+
+
+def profile_first_rpc(cls):
+    """Wrap the public async methods of cls so the first RPC served is recorded."""
+    if not _enabled:
+        return cls
+
+    def wrap(name, fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            global _first_rpc, _report_task
+            if _first_rpc is None:
+                _first_rpc = (name, time.perf_counter() - _epoch)
+                # Written on the I/O pool, not inside the call being measured
+                from utils.aio import run_blocking
+                _report_task = asyncio.ensure_future(run_blocking(write_startup_report))
+            return await fn(*args, **kwargs)
+        return wrapper
+
+    for name, fn in list(vars(cls).items()):
+        if not name.startswith("_") and inspect.iscoroutinefunction(fn):
+            setattr(cls, name, wrap(name, fn))
+    return cls
+
+
+def startup_report() -> dict:
+    process_start = _process_start()
+    offset = _epoch_wall - process_start if process_start else None
+    ms = lambda s: round(s * 1000.0, 3)
+    imports = sorted(_imports.items(), key=lambda kv: -kv[1][0])
+    report = {
+        "generated": time.time(),
+        "process_start": process_start,
+        "profiling_started_after_ms": ms(offset) if offset is not None else None,
+        "imports": [{"module": m, "cumulative_ms": ms(c), "self_ms": ms(s)} for m, (c, s) in imports],
+        "phases": [{"name": n, "start_ms": ms(st), "duration_ms": ms(d)} for n, st, d in _phases],
+        "first_rpc": None,
+    }
+    if _first_rpc is not None:
+        name, at = _first_rpc
+        report["first_rpc"] = {
+            "name": name,
+            "at_ms": ms(at),
+            "since_process_start_ms": ms(at + offset) if offset is not None else None,
+        }
+    return report
+
+
+def write_startup_report():
+    if not _enabled:
+        return
+    try:
+        os.makedirs(os.path.dirname(profile_report), exist_ok=True)
+        with open(profile_report, "w") as f:
+            json.dump(startup_report(), f, indent=4)
+    except Exception as e:
+        decky_plugin.logger.error(f"Failed to write startup profile: {e}")
+
+
+def read_startup_report():
+    """The last written report, also from an earlier run; None if there is none."""
+    try:
+        with open(profile_report, "r") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def set_startup_profiling(enabled: bool) -> bool:
+    try:
+        if enabled:
+            os.makedirs(os.path.dirname(profile_marker), exist_ok=True)
+            open(profile_marker, "a").close()
+        elif os.path.exists(profile_marker):
+            os.remove(profile_marker)
+        return True
+    except Exception as e:
+        decky_plugin.logger.error(f"Failed to toggle startup profiling: {e}")
+        return False
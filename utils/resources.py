@@ -0,0 +1,116 @@
+import os
+import shutil
+from pathlib import Path
+from utils.constants import logger, shaders_folder, destination_folder, textures_folder, textures_destination, optimized_textures_folder
+from utils.state import State
+from utils.fx import resolve_dependencies
+from utils.manifest import manifest_entry
+
+# ---------------------------------------------------------------------------
+# Install modes
+#   "lazy"  - only the shader catalog (.fx files) is installed at startup;
+#             headers and textures are materialized the first time a shader
+#             that references them is applied.
+#   "eager" - everything in shaders/ and textures/ is installed at startup.
+# ---------------------------------------------------------------------------
+
+INSTALL_MODES = ("lazy", "eager")
+
+
+def _copy_if_changed(src: Path, dst: Path, mode: int) -> bool:
+    """Copy src to dst unless dst already has the same size and mtime."""
+    try:
+        s = src.stat()
+        if dst.exists():
+            d = dst.stat()
+            if d.st_size == s.st_size and int(d.st_mtime) == int(s.st_mtime):
+                return False
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(src, dst)
+        os.chmod(dst, mode)
+        return True
+    except Exception as e:
+        logger.error(f"Failed to install {src}: {e}")
+        return False
+
+
+def _file_mode(name: str) -> int:
+    return 0o755 if name.endswith(".sh") else 0o644
+
+
+def _texture_source(rel: str) -> Path:
+    """Prefer the build-time optimized variant (tools/optimize_textures.py) of a texture."""
+    optimized = Path(optimized_textures_folder) / rel
+    return optimized if optimized.exists() else Path(textures_folder) / rel
+
+
+def _install_tree(src_root: str, dst_root: str, suffixes=None, source_for=None) -> int:
+    """Mirror src_root into dst_root, optionally restricted to file suffixes."""
+    copied = 0
+    if not Path(src_root).exists():
+        return copied
+    for root, dirs, files in os.walk(src_root, followlinks=True):
+        rel = os.path.relpath(root, src_root)
+        for f in files:
+            if suffixes and not f.endswith(suffixes):
+                continue
+            src = Path(root) / f
+            if source_for is not None:
+                src = source_for(os.path.normpath(os.path.join(rel, f)))
+            dst = Path(dst_root) / rel / f
+            if not src.exists():
+                continue  # dangling symlink, e.g. an uninitialized submodule
+            if _copy_if_changed(src, dst, _file_mode(f)):
+                copied += 1
+    return copied
+
+
+def install_catalog() -> int:
+    """Install only the shader catalog (.fx files)."""
+    Path(destination_folder).mkdir(parents=True, exist_ok=True)
+    return _install_tree(shaders_folder, destination_folder, (".fx",))
+
+
+def install_all() -> int:
+    """Install every bundled shader, header and texture."""
+    Path(destination_folder).mkdir(parents=True, exist_ok=True)
+    copied = _install_tree(shaders_folder, destination_folder)
+    copied += _install_tree(textures_folder, textures_destination, source_for=_texture_source)
+    return copied
+
+
+def install_resources(mode: str = "lazy"):
+    try:
+        if mode == "eager":
+            copied = install_all()
+        else:
+            copied = install_catalog()
+        logger.info(f"Installed resources ({mode}): {copied} file(s) copied")
+    except Exception as e:
+        logger.error(f"Failed to install resources: {e}")
+
+
+def find_shader_dependencies(shader_name: str, text: str):
+    """Return (includes, textures) a shader needs, relative to the bundled roots."""
+    entry = manifest_entry(shader_name)
+    if entry is not None:
+        return entry.get("includes", []), entry.get("textures", [])
+    return resolve_dependencies(shader_name, text, Path(shaders_folder))
+
+
+def ensure_shader_dependencies(shader_name: str, text: str):
+    """Materialize the headers and textures a shader needs, once per session."""
+    if shader_name in State.installed_dependencies:
+        return
+    includes, textures = find_shader_dependencies(shader_name, text)
+    copied = 0
+    for rel in includes:
+        if _copy_if_changed(Path(shaders_folder) / rel, Path(destination_folder) / rel, 0o644):
+            copied += 1
+    for rel in textures:
+        src = _texture_source(rel)
+        if src.exists() and _copy_if_changed(src, Path(textures_destination) / rel, 0o644):
+            copied += 1
+    if copied:
+        logger.info(f"Installed {copied} dependency file(s) for {shader_name}")
+    State.installed_dependencies.add(shader_name)
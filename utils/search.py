@@ -0,0 +1,185 @@
+import re
+import bisect
+import threading
+from utils.constants import logger
+from utils.state import State
+from utils.catalog import catalog_packages_async, catalog_list_async
+from utils.shader import parse_shader_params, shader_stamp
+from utils.manifest import manifest_params
+from utils.aio import run_blocking
+
+# ---------------------------------------------------------------------------
+# Inverted index over installed shaders: names, uniform names, ui_labels and
+# ui_items. Built incrementally, so only shaders that are new or changed
+# since the last query get (re)indexed. Specs are read from the manifest or
+# parsed directly, bypassing State.params_meta so a search over the whole
+# catalog doesn't evict the shaders in use from that LRU.
+# ---------------------------------------------------------------------------
+
+SEARCH_LIMIT = 50
+
+# Field weights: a hit in the shader name outranks one in a combo item
+W_SHADER = 5.0
+W_LABEL = 3.0
+W_UNIFORM = 2.0
+W_ITEM = 1.0
+PREFIX_FACTOR = 0.5
+
+_RE_WORD = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+
+
+def tokenize(text: str) -> list:
+    """Lowercase words, splitting camelCase, snake_case and digits."""
+    return [w.lower() for w in _RE_WORD.findall(text)]
+
+
+class SearchIndex:
+    def __init__(self):
+        self._postings = {}  # {token: {shader: weight}}
+        self._tokens = []  # sorted tokens, for prefix lookups
+        self._docs = {}  # {shader: (stamp, tokens)}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._docs)
+
+    def stamp(self, shader: str):
+        doc = self._docs.get(shader)
+        return doc[0] if doc else None
+
+    def add(self, shader: str, specs, stamp=None):
+        weights = {}
+
+        def put(text, weight):
+            for tok in tokenize(text):
+                if weights.get(tok, 0.0) < weight:
+                    weights[tok] = weight
+
+        put(shader.rsplit(".", 1)[0], W_SHADER)
+        for p in specs:
+            put(p.name, W_UNIFORM)
+            if p.ui_label:
+                put(p.ui_label, W_LABEL)
+            for item in p.ui_items or ():
+                put(item, W_ITEM)
+
+        with self._lock:
+            self._remove(shader)
+            for tok, weight in weights.items():
+                posting = self._postings.get(tok)
+                if posting is None:
+                    posting = self._postings[tok] = {}
+                    bisect.insort(self._tokens, tok)
+                posting[shader] = weight
+            self._docs[shader] = (stamp, tuple(weights))
+
+    def remove(self, shader: str):
+        with self._lock:
+            self._remove(shader)
+
+    def _remove(self, shader: str):
+        doc = self._docs.pop(shader, None)
+        if doc is None:
+            return
+        for tok in doc[1]:
+            posting = self._postings.get(tok)
+            if posting is None:
+                continue
+            posting.pop(shader, None)
+            if not posting:
+                del self._postings[tok]
+                i = bisect.bisect_left(self._tokens, tok)
+                if i < len(self._tokens) and self._tokens[i] == tok:
+                    del self._tokens[i]
+
+    def retain(self, shaders: set):
+        with self._lock:
+            for shader in [s for s in self._docs if s not in shaders]:
+                self._remove(shader)
+
+    def _match(self, term: str) -> dict:
+        """{shader: best weight} for an exact or prefix match of term."""
+        scores = dict(self._postings.get(term, {}))
+        i = bisect.bisect_left(self._tokens, term)
+        while i < len(self._tokens) and self._tokens[i].startswith(term):
+            tok = self._tokens[i]
+            i += 1
+            if tok == term:
+                continue
+            for shader, weight in self._postings[tok].items():
+                weight *= PREFIX_FACTOR
+                if scores.get(shader, 0.0) < weight:
+                    scores[shader] = weight
+        return scores
+
+    def search(self, query: str, limit: int = SEARCH_LIMIT) -> list:
+        terms = tokenize(query)
+        if not terms:
+            return []
+        with self._lock:
+            totals = None
+            for term in terms:
+                scores = self._match(term)
+                if totals is None:
+                    totals = scores
+                else:
+                    # Every term must match somewhere in the shader
+                    totals = {s: totals[s] + w for s, w in scores.items() if s in totals}
+                if not totals:
+                    return []
+        ranked = sorted(totals.items(), key=lambda kv: (-kv[1], kv[0].lower()))
+        return [{"shader": s, "score": score} for s, score in ranked[:limit]]
+
+
+async def installed_shaders() -> list:
+    names = []
+    for category in await catalog_packages_async():
+        names.extend(await catalog_list_async(category))
+    return names
+
+
+def _index() -> SearchIndex:
+    if State.search_index is None:
+        State.search_index = SearchIndex()
+    return State.search_index
+
+
+def refresh_index(shaders: list) -> int:
+    """Index shaders that are new or changed since the last refresh."""
+    index = _index()
+    index.retain(set(shaders))
+    # While the file watcher runs it evicts changed shaders itself, so only
+    # unindexed ones need work; otherwise compare file stamps
+    watching = State.watcher is not None
+    indexed = 0
+    for shader in shaders:
+        if index.stamp(shader) is not None and (watching or index.stamp(shader) == shader_stamp(shader)):
+            continue
+        stamp = shader_stamp(shader)
+        try:
+            specs = manifest_params(shader)
+            if specs is None:
+                specs = parse_shader_params(shader)
+            index.add(shader, specs, stamp)
+        except Exception as e:
+            # Still findable by name even if its parameters can't be parsed
+            logger.warning(f"Search index: could not parse {shader}: {e}")
+            index.add(shader, (), stamp)
+        indexed += 1
+    return indexed
+
+
+def _refresh_and_search(shaders: list, query: str, limit: int) -> list:
+    refresh_index(shaders)
+    return _index().search(query, limit)
+
+
+async def search_shaders(query: str, limit: int = SEARCH_LIMIT) -> list:
+    # The catalog is read on the event loop, indexing and querying run on the I/O pool
+    shaders = await installed_shaders()
+    return await run_blocking(_refresh_and_search, shaders, query, limit)
+
+
+def forget_shader(shader: str):
+    if State.search_index is not None:
+        State.search_index.remove(shader)
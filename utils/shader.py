@@ -1,136 +1,73 @@
 import os
 import re
+import string
+import secrets
 import asyncio
+import threading
 from pathlib import Path
-from utils.constants import logger, shaders_folder, destination_folder
+from utils.constants import logger, shaders_folder, destination_folder, textures_destination, system_shaders_folder, system_textures_folder
 from utils.state import State
+from utils.resources import ensure_shader_dependencies
+from utils.params import ParamSpec, ShaderParams
+from utils.fx import apply_shader_transformations, parse_shader_text, content_hash
+from utils.manifest import manifest_params
+from utils.aio import run_blocking
+from utils.power import effective_shader
+from utils.validate import validate_effect
+from utils.chain import compile_chain, chain_hash
 
-# ---------------------------------------------------------------------------
-# Regex patterns for parsing .fx uniform parameters
-# ---------------------------------------------------------------------------
+_ACTIVE_ALPHABET = string.ascii_letters + string.digits
 
-_RE_ANNOTATED = re.compile(
-    r"uniform\s+(float|bool|int)\s+(\w+)\s*<\s*([^>]*)\s*>\s*=\s*(.*?)\s*;",
-    re.DOTALL,
-)
+CHAIN_CACHE_SIZE = 8
+_chain_lock = threading.Lock()
 
-_RE_PLAIN = re.compile(
-    r"uniform\s+(float|bool|int)\s+(\w+)\s*=\s*([-+]?\d+\.?\d*)\s*;",
-)
 
-_RE_UI = {
-    "ui_type":  re.compile(r'ui_type\s*=\s*"(\w+)"'),
-    "ui_min":   re.compile(r'ui_min\s*=\s*([-+]?\d+\.?\d*)'),
-    "ui_max":   re.compile(r'ui_max\s*=\s*([-+]?\d+\.?\d*)'),
-    "ui_step":  re.compile(r'ui_step\s*=\s*([-+]?\d+\.?\d*)'),
-    "ui_label": re.compile(r'ui_label\s*=\s*"([^"]*)"'),
-}
-
-_RE_UI_ITEMS = re.compile(r'ui_items\s*=\s*"((?:[^"\\]|\\0)*)"')
-
-_RE_SOURCE = re.compile(r'source\s*=\s*"')
+def find_shader_file(shader_name: str):
+    """Locate a shader in the bundled folder first, then in the installed one."""
+    source_file = Path(shaders_folder) / shader_name
+    if source_file.exists():
+        return source_file
+    dest_file = Path(destination_folder) / shader_name
+    if dest_file.exists():
+        return dest_file
+    return None
 
-def apply_shader_transformations(text: str) -> str:
-    """Transforms upstream .fx files to be compatible by injecting UI annotations."""
-    # Remove the ReShadeUI include as it's not needed/causes errors if missing
-    text = re.sub(r'#include "ReShadeUI\.fxh"', "", text)
-    
-    # Transform different uniform types
-    # 1. Sliders (FLOAT/INT) -> ui_type = "drag"
-    text = re.sub(r'<\s*__UNIFORM_SLIDER_(?:FLOAT|INT)[1-3]', r'<\n    ui_type = "drag";', text)
-    
-    # 2. Colors -> ui_type = "color"
-    text = re.sub(r'<\s*__UNIFORM_COLOR_FLOAT[1-3]', r'< ui_type = "color";', text)
-    
-    # 3. Combos -> ui_type = "combo"
-    text = re.sub(r'<\s*__UNIFORM_COMBO_INT1', r'<\n    ui_type = "combo";', text)
-    
-    # 4. Inputs/Drags (BOOL/Drag Float) -> ui_type = "drag"
-    text = re.sub(r'<\s*__UNIFORM_INPUT_BOOL1', r'<\n    ui_type = "drag";', text)
-    text = re.sub(r'<\s*__UNIFORM_DRAG_FLOAT[1-2]', r'<\n    ui_type = "drag";', text)
-    
-    return text
 
-def parse_shader_params(shader_name: str) -> list[dict]:
+def parse_shader_params(shader_name: str) -> list[ParamSpec]:
     """Parse all user-tuneable uniform parameters from a .fx file."""
-    source_file = Path(shaders_folder) / shader_name
-    dest_file = Path(destination_folder) / shader_name
-    fx_file = source_file if source_file.exists() else dest_file
-    if not fx_file.exists():
+    fx_file = find_shader_file(shader_name)
+    if fx_file is None:
         logger.warning(f"Shader file not found: {shader_name}")
         return []
 
     text = fx_file.read_text(encoding="utf-8", errors="replace")
-    
-    text = apply_shader_transformations(text)
-        
-    params: list[dict] = []
-    # --- annotated uniforms ---
-    for m in _RE_ANNOTATED.finditer(text):
-        utype, uname, annotation, raw_default = (
-            m.group(1), m.group(2), m.group(3), m.group(4).strip()
-        )
-        if _RE_SOURCE.search(annotation):
-            continue
-
-        p: dict = {"name": uname, "type": utype}
+    return parse_shader_text(shader_name, text)
 
-        for key, pat in _RE_UI.items():
-            hit = pat.search(annotation)
-            if hit:
-                p[key] = hit.group(1)
 
-        items_hit = _RE_UI_ITEMS.search(annotation)
-        if items_hit:
-            raw_items = items_hit.group(1)
-            p["ui_items"] = [s for s in raw_items.split("\\0") if s]
+def shader_stamp(shader_name: str):
+    """(mtime_ns, size) of the file a shader resolves to, or None if missing."""
+    fx_file = find_shader_file(shader_name)
+    if fx_file is None:
+        return None
+    st = fx_file.stat()
+    return (st.st_mtime_ns, st.st_size)
 
-        if utype == "float":
-            p["default"] = float(raw_default)
-        elif utype == "bool":
-            p["default"] = raw_default.lower() == "true"
-        elif utype == "int":
-            p["default"] = int(raw_default)
-        else:
-            p["default"] = raw_default
-
-        for k in ("ui_min", "ui_max", "ui_step"):
-            if k in p:
-                p[k] = float(p[k])
 
-        if "ui_label" not in p:
-            base = shader_name.replace(".fx", "")
-            p["ui_label"] = f"{uname} [{base}]"
+def get_shader_params_meta(shader_name: str) -> ShaderParams:
+    """Cached parameter metadata, re-parsed only when the .fx file changes."""
+    stamp = shader_stamp(shader_name)
+    meta = State.params_meta.get(shader_name, stamp)
+    if meta is None:
+        specs = manifest_params(shader_name)
+        if specs is None:
+            specs = parse_shader_params(shader_name)
+        meta = ShaderParams(specs, stamp)
+        State.params_meta.put(shader_name, meta)
+    return meta
 
-        params.append(p)
 
-    # --- plain uniforms (CAS-style, no annotation block) ---
-    annotated_names = {p["name"] for p in params}
-    for m in _RE_PLAIN.finditer(text):
-        utype, uname, raw_default = m.group(1), m.group(2), m.group(3)
-        if uname in annotated_names:
-            continue
-        line_start = text.rfind("\n", 0, m.start()) + 1
-        preceding = text[line_start:m.start()]
-        if "<" in preceding:
-            continue
-        if uname.lower() in ("iglobaltime", "framecount", "fcount"):
-            continue
-
-        base = shader_name.replace(".fx", "")
-        p = {
-            "name": uname,
-            "type": utype,
-            "default": float(raw_default) if utype == "float" else int(raw_default),
-            "ui_type": "drag",
-            "ui_min": 0.0,
-            "ui_max": 2.0,
-            "ui_step": 0.01,
-            "ui_label": f"{uname} [{base}]",
-        }
-        params.append(p)
-
-    return params
+async def get_shader_params_meta_async(shader_name: str) -> ShaderParams:
+    return await run_blocking(get_shader_params_meta, shader_name)
 
 
 def apply_params_to_content(text: str, params: dict) -> str:
@@ -168,52 +105,253 @@ def apply_params_to_content(text: str, params: dict) -> str:
     return text
 
 
-def generate_staging_shader(shader_name: str) -> str:
-    """Read source shader, patch in memory, write to fixed staging file .reshadeck.fx"""
-    source_file = Path(shaders_folder) / shader_name
-    if not source_file.exists():
-        source_file = Path(destination_folder) / shader_name
-        
-    if not source_file.exists():
-        logger.error(f"Generate staging: Source {shader_name} not found")
-        return shader_name
+def render_shader(shader_name: str, params: dict = None):
+    """Read source shader and patch parameters in memory. Returns None if missing."""
+    source_file = find_shader_file(shader_name)
+    if source_file is None:
+        return None
 
     text = source_file.read_text(encoding="utf-8", errors="replace")
     text = apply_shader_transformations(text)
+    ensure_shader_dependencies(shader_name, text)
     
-    params = State.shader_parameters.get(shader_name, {})
-    patched_text = apply_params_to_content(text, params)
-    
-    staging_filename = ".reshadeck.fx"
-    full_dest_path = Path(destination_folder) / staging_filename
-    full_dest_path.write_text(patched_text, encoding="utf-8")
-    
-    return staging_filename
+    if params is None:
+        params = State.shader_parameters.get(shader_name, {})
+    return apply_params_to_content(text, params)
 
 
-async def apply_shader_internal(target_shader: str):
+def prepare_effect(shader_name: str, params: dict = None):
     """
-    Pure dumb function that takes target_shader and shells out to set_shader.sh.
-    Does NOT contain logical checks for whether it should run.
+    Render a shader and validate the result against what gamescope will see.
+    Returns (text, errors); text is None if the shader doesn't exist.
     """
-    staging_file = target_shader
-    if target_shader != "None":
-        staging_file = generate_staging_shader(target_shader)
-        
-    logger.info(f"Applying shader {target_shader} via {staging_file}")
+    if params is None:
+        params = State.shader_parameters.get(shader_name, {})
+    text = render_shader(shader_name, params)
+    if text is None:
+        return None, []
+    try:
+        specs = get_shader_params_meta(shader_name)
+    except Exception as e:
+        # Parse failures only cost the parameter UI and value checks, not the effect
+        logger.warning(f"Parameters of {shader_name} not parsed, skipping value checks: {e}")
+        specs, params = (), None
+    warnings = []
+    errors = validate_effect(
+        text, shader_name,
+        [destination_folder, system_shaders_folder],
+        [textures_destination, system_textures_folder],
+        specs, params, warnings,
+    )
+    for w in warnings:
+        logger.debug(f"Validation of {shader_name}, in a conditional branch: {w}")
+    return text, errors
+
+
+def active_chain(shader_name: str) -> list:
+    """shader_name followed by the shaders chained after it when it is the active one."""
+    chain = [shader_name]
+    if shader_name == "None" or shader_name != State.active_shader:
+        return chain
+    for name in State.chained_shaders:
+        # Parameters are keyed by shader name, so a repeat would be an identical pass
+        if name != "None" and name not in chain:
+            chain.append(name)
+    return chain
+
+
+def prepare_chain(shaders: list, params: dict):
+    """
+    Render and validate every shader of a chain, merge them into one effect
+    (utils/chain.py) and validate the merged text too. Returns (text, errors)
+    like prepare_effect; text is None if the first shader doesn't exist,
+    missing later ones are left out. params is {shader_name: parameters},
+    snapshotted by the caller so the cache key and the rendered text agree.
+    Valid merged effects are cached by shader names, file stamps and
+    parameters, so re-applying an unchanged chain skips rendering altogether.
+    """
+    if len(shaders) == 1:
+        return prepare_effect(shaders[0], params[shaders[0]])
+    key = chain_hash([(name, shader_stamp(name), params[name]) for name in shaders])
+    with _chain_lock:
+        text = State.compiled_chains.get(key)
+        if text is not None:
+            State.compiled_chains.move_to_end(key)
+            return text, []
+
+    parts = []
+    errors = []
+    for name in shaders:
+        text, part_errors = prepare_effect(name, params[name])
+        if text is None:
+            if not parts:
+                return None, []
+            logger.warning(f"Chained shader {name} not found, skipping it")
+            continue
+        errors += [f"{name}: {e}" for e in part_errors]
+        parts.append((name, text))
+    text = compile_chain(parts)
+    # The merged file sits at the root of the shaders folder, includes resolve from there
+    errors += [f"chain: {e}" for e in validate_effect(
+        text, "",
+        [destination_folder, system_shaders_folder],
+        [textures_destination, system_textures_folder],
+    )]
+    if not errors:
+        with _chain_lock:
+            State.compiled_chains[key] = text
+            while len(State.compiled_chains) > CHAIN_CACHE_SIZE:
+                State.compiled_chains.popitem(last=False)
+    return text, errors
+
+
+def _new_active_name() -> str:
+    # Gamescope caches effects by file name, so every activation needs a fresh one
+    token = "".join(secrets.choice(_ACTIVE_ALPHABET) for _ in range(6))
+    return f".reshadeck.active.{token}.fx"
+
+
+def write_active_effect(text: str):
+    """
+    Materialize rendered effect text under a fresh active file name with a
+    single write (temp file + os.replace), or a hardlink to the current
+    active file when the content is unchanged. Returns (name, content hash);
+    the file only becomes the current one through _adopt_active_file.
+    """
+    folder = Path(destination_folder)
+    name = _new_active_name()
+    digest = content_hash(text.encode("utf-8"))
+    current = State.active_files[-1] if State.active_files else None
+    if current and State.active_effect_hash == digest:
+        try:
+            os.link(folder / current, folder / name)
+            return name, digest
+        except OSError:
+            pass
+    tmp = folder / f".reshadeck.tmp.{name[len('.reshadeck.active.'):]}"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, folder / name)
+    return name, digest
+
+
+def _tracked_active_files() -> list:
+    if State.active_files is None:
+        # First apply of the session: adopt leftovers from previous runs once
+        State.active_files = [p.name for p in Path(destination_folder).glob(".reshadeck.active.*.fx")]
+    return State.active_files
+
+
+def _adopt_active_file(name: str, digest: str):
+    """Make name the current active file once gamescope has been pointed at it."""
+    _tracked_active_files().append(name)
+    collect_active_files(name)
+    State.active_effect_hash = digest
+
+
+def collect_active_files(keep: str = None):
+    """Delete every tracked active file except keep."""
+    for name in _tracked_active_files():
+        if name == keep:
+            continue
+        try:
+            (Path(destination_folder) / name).unlink()
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"Failed to remove stale effect {name}: {e}")
+    State.active_files = [keep] if keep else []
+    if not keep:
+        State.active_effect_hash = None
+
+
+async def set_effect_property(effect_file: str) -> bool:
+    """Point gamescope at an already written effect file ("None" clears it)."""
+    if effect_file == "None":
+        args = ['xprop', '-root', '-remove', 'GAMESCOPE_RESHADE_EFFECT']
+    else:
+        args = ['xprop', '-root', '-f', 'GAMESCOPE_RESHADE_EFFECT', '8u', '-set', 'GAMESCOPE_RESHADE_EFFECT', effect_file]
     try:
         env = os.environ.copy()
         env["LD_LIBRARY_PATH"] = ""
-        
+        env["DISPLAY"] = ":0"
         proc = await asyncio.create_subprocess_exec(
-            shaders_folder + "/set_shader.sh", staging_file, destination_folder,
+            *args,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE,
             env=env
         )
         stdout, stderr = await proc.communicate()
-        logger.info(f"Apply shader result: {proc.returncode}")
-        if stdout: logger.debug(f"stdout: {stdout.decode()}")
-        if stderr: logger.error(f"stderr: {stderr.decode()}")
+        if stderr: logger.error(f"xprop stderr: {stderr.decode()}")
+        return proc.returncode == 0
+    except Exception as e:
+        logger.error(f"Setting effect property failed: {e}")
+        return False
+
+
+def _remove_compare_files(files: list):
+    for f in files:
+        if f != "None":
+            try:
+                (Path(destination_folder) / f).unlink()
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.error(f"Failed to remove compare file {f}: {e}")
+
+
+async def discard_compare_files():
+    """Remove the pre-staged A/B files; any regular apply supersedes a comparison."""
+    if not State.compare:
+        return
+    files = list(State.compare["files"].values())
+    State.compare = None
+    await run_blocking(_remove_compare_files, files)
+
+
+async def apply_shader_internal(target_shader: str):
+    """
+    Pure dumb function that renders target_shader into a fresh active file and
+    points gamescope at it. Does NOT contain logical checks for whether it should run.
+    Returns False if the effect was refused by validation or could not be set.
+    """
+    await discard_compare_files()
+    # On battery the profile's cheaper alternative stands in for the active shader
+    target_shader = effective_shader(target_shader)
+
+    if target_shader == "None":
+        logger.info("Applying shader None")
+        ok = await set_effect_property("None")
+        logger.info(f"Apply shader result: {ok}")
+        await run_blocking(collect_active_files, None)
+        return ok
+
+    try:
+        chain = active_chain(target_shader)
+        # Snapshot the parameters on the loop: a slider moved while the worker
+        # renders must not end up in text cached under the old key
+        params = {name: dict(State.shader_parameters.get(name, {})) for name in chain}
+        text, errors = await run_blocking(prepare_chain, chain, params)
+        if text is None:
+            logger.error(f"Apply shader: Source {target_shader} not found")
+            await set_effect_property("None")
+            await run_blocking(collect_active_files, None)
+            return False
+        State.validation_errors = errors
+        if errors:
+            # Refuse rather than let gamescope crash and restart on it
+            logger.error(f"Apply shader: {target_shader} failed validation: {'; '.join(errors)}")
+            return False
+
+        active, digest = await run_blocking(write_active_effect, text)
+        logger.info(f"Applying shader {' -> '.join(chain)} via {active}")
+        ok = await set_effect_property(active)
+        logger.info(f"Apply shader result: {ok}")
+        if ok:
+            await run_blocking(_adopt_active_file, active, digest)
+        else:
+            (Path(destination_folder) / active).unlink(missing_ok=True)
+        return ok
     except Exception as e:
         logger.exception(f"Apply shader failed: {e}")
+        return False
@@ -1,7 +1,12 @@
+from collections import deque, OrderedDict
+from utils.params import ParamsCache
+
 class State:
     master_switch = True
     active_shader = "None"
     shader_parameters = {}  # {shader_name: {param_name: value, ...}}
+    chained_shaders = []  # applied after active_shader, merged into one effect (utils/chain.py)
+    compiled_chains = OrderedDict()  # LRU: {chain hash: merged effect text}
     crash_detected = False
     per_game_mode = False
     current_appid = "Unknown"
@@ -9,8 +14,39 @@ class State:
     # State related to packages and caching
     appname = "Unknown"
     active_category = "Default"
-    params_meta = {}  # cache: {shader_name: [param_dict, ...]}
+    params_meta = ParamsCache()  # LRU cache: {shader_name: ShaderParams}
+    install_mode = "lazy"  # "lazy" | "eager", see utils/resources.py
+    shader_manifest = None  # build-time metadata, loaded on first use (utils/manifest.py)
+    installed_dependencies = set()  # shaders whose includes/textures are installed this session
+    
+    # Catalog and file watching (utils/catalog.py, utils/watcher.py)
+    catalog = None  # {category: set(shader file names)}, None when not watching
+    catalog_version = 0  # bumped on every catalog change so the UI can poll
+    live_reload = False  # re-apply the active shader when its files change
+    watcher = None
+    search_index = None  # utils.search.SearchIndex, created on first search
+    
+    # Active effect files (utils/shader.py)
+    active_files = None  # tracked .reshadeck.active.*.fx names, None until first apply
+    active_effect_hash = None  # content hash of the newest active file
+    
+    # Battery-aware downgrade (utils/power.py)
+    battery_shader = "None"  # per-profile cheaper alternative used on battery
+    on_battery = False
+    power_supply_root = None  # overrides utils.constants.power_supply_root
+    
+    validation_errors = []  # problems found in the last refused apply (utils/validate.py)
+    
+    # A/B comparison (utils/compare.py)
+    compare = None  # {"shaders": {"a": name, "b": name}, "files": {...}, "side": "a"}
+    compare_latencies = deque(maxlen=100)  # toggle latencies in ms
     
     # Task Management
     active_crash_monitor_task = None
     debounce_task = None
+    reload_task = None
+    loop_lag_task = None
+    power_task = None
+    journal_task = None  # periodic config journal compaction (utils/config.py)
+    loop_lag_events = 0  # probes that woke up late (utils/aio.py)
+    loop_lag_max = 0.0  # worst observed lag in seconds
@@ -0,0 +1,187 @@
+import re
+from pathlib import Path
+from utils.fx import find_includes, find_texture_sources, blank_comments_and_strings, blank_comments
+
+# ---------------------------------------------------------------------------
+# Pre-apply ReShade FX validation. A broken effect crashes gamescope, so the
+# rendered text is checked before it is activated. Pure Python and free of
+# decky_plugin so tools/validate_shaders.py can run it over the whole corpus.
+# ---------------------------------------------------------------------------
+
+# Headers gamescope ships itself and resolves from its own install
+BUILTIN_INCLUDES = ("ReShade.fxh", "ReShadeUI.fxh")
+
+_RE_TECHNIQUE = re.compile(r'\btechnique\s+(\w+)[^{;]*\{')
+_RE_PASS = re.compile(r'\bpass\b')
+
+_PAIRS = {"}": "{", ")": "(", "]": "["}
+
+_RE_DIRECTIVE = re.compile(r'^[ \t]*#[ \t]*(ifdef|ifndef|if|elif|else|endif|define|undef)\b(.*)$')
+_RE_DEFINED = re.compile(r'(!\s*)?defined\s*\(?\s*(\w+)\s*\)?')
+
+
+def _line(text: str, pos: int) -> int:
+    return text.count("\n", 0, pos) + 1
+
+
+def check_brackets(code: str) -> list:
+    errors = []
+    stack = []
+    for i, c in enumerate(code):
+        if c in "{([":
+            stack.append((c, i))
+        elif c in "})]":
+            if not stack or stack[-1][0] != _PAIRS[c]:
+                errors.append(f"Unexpected '{c}' at line {_line(code, i)}")
+                return errors
+            stack.pop()
+    for c, i in stack:
+        errors.append(f"Unclosed '{c}' opened at line {_line(code, i)}")
+    return errors
+
+
+def check_techniques(code: str) -> list:
+    errors = []
+    techniques = list(_RE_TECHNIQUE.finditer(code))
+    if not techniques:
+        return ["No technique declared"]
+    for m in techniques:
+        depth, end = 1, m.end()
+        while end < len(code) and depth:
+            depth += {"{": 1, "}": -1}.get(code[end], 0)
+            end += 1
+        if not _RE_PASS.search(code, m.end(), end):
+            errors.append(f"Technique '{m.group(1)}' has no pass")
+    return errors
+
+
+def _condition(kind: str, expr: str, defines: set):
+    """Evaluate a #if/#ifdef/#ifndef/#elif condition: True, False or None when unknown."""
+    expr = expr.strip()
+    if kind == "ifdef":
+        return True if expr in defines else None
+    if kind == "ifndef":
+        return False if expr in defines else None
+    if expr.isdigit():
+        return int(expr) != 0
+    m = _RE_DEFINED.fullmatch(expr)
+    if m and m.group(2) in defines:
+        return not m.group(1)
+    return None
+
+
+def branch_states(code: str) -> list:
+    """
+    Per line of code (comments already blanked), whether the preprocessor
+    keeps it: True, False inside a disabled branch, None where that depends
+    on a condition that can't be decided from the text alone (macros set by
+    gamescope or by headers). Only literal conditions and macros the text
+    itself #defines are evaluated.
+    """
+    states = []
+    stack = []  # [state of the current branch, an earlier branch was taken, one might have been]
+    defines = set()
+    for line in code.split("\n"):
+        current = True
+        for frame in stack:
+            if frame[0] is False:
+                current = False
+                break
+            if frame[0] is None:
+                current = None
+        m = _RE_DIRECTIVE.match(line)
+        states.append(current)
+        if not m:
+            continue
+        kind, arg = m.group(1), m.group(2)
+        if kind in ("if", "ifdef", "ifndef"):
+            cond = _condition(kind, arg, defines)
+            stack.append([cond, cond is True, cond is None])
+        elif kind in ("elif", "else") and stack:
+            frame = stack[-1]
+            cond = True if kind == "else" else _condition("if", arg, defines)
+            if frame[1] or cond is False:
+                frame[0] = False
+            else:
+                frame[0] = None if frame[2] or cond is None else True
+            frame[1] = frame[1] or frame[0] is True
+            frame[2] = frame[2] or frame[0] is None
+        elif kind == "endif" and stack:
+            stack.pop()
+        elif current is True and arg.split():
+            name = arg.split()[0].split("(")[0]
+            if kind == "define":
+                defines.add(name)
+            else:
+                defines.discard(name)
+    return states
+
+
+def _keep_lines(code: str, states: list, keep) -> str:
+    return "\n".join(line if state is keep else "" for line, state in zip(code.split("\n"), states))
+
+
+def check_includes(text: str, shader_name: str, include_roots: list) -> list:
+    errors = []
+    shader_dir = Path(shader_name).parent
+    for inc in find_includes(text):
+        if inc in BUILTIN_INCLUDES:
+            continue
+        if not any((Path(r) / shader_dir / inc).exists() or (Path(r) / inc).exists() for r in include_roots):
+            errors.append(f"Include not found: {inc}")
+    return errors
+
+
+def check_textures(text: str, texture_roots: list) -> list:
+    errors = []
+    for tex in find_texture_sources(text):
+        if not any((Path(r) / tex).exists() for r in texture_roots):
+            errors.append(f"Texture not found: {tex}")
+    return errors
+
+
+def check_values(specs, values: dict) -> list:
+    """Check parameter values against each ParamSpec's ui_items and declared ui_min/ui_max."""
+    errors = []
+    for p in specs:
+        if p.name not in values or p.type == "bool":
+            continue
+        value = values[p.name]
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            errors.append(f"{p.name}: expected a number, got {value!r}")
+            continue
+        if p.ui_items:
+            if not 0 <= value < len(p.ui_items):
+                errors.append(f"{p.name}: {value} is not a valid choice")
+            continue
+        if p.ui_range_implicit:
+            continue
+        if p.ui_min is not None and value < p.ui_min:
+            errors.append(f"{p.name}: {value} is below ui_min {p.ui_min}")
+        if p.ui_max is not None and value > p.ui_max:
+            errors.append(f"{p.name}: {value} is above ui_max {p.ui_max}")
+    return errors
+
+
+def validate_effect(text: str, shader_name: str, include_roots: list, texture_roots: list,
+                    specs=(), values: dict = None, warnings: list = None) -> list:
+    """
+    Return a list of problems that would make gamescope reject or crash on the
+    effect. Missing includes and textures only count where the preprocessor
+    keeps them; in branches that can't be decided they are added to warnings.
+    """
+    code = blank_comments_and_strings(text)
+    errors = check_brackets(code)
+    errors += check_techniques(code)
+    sources = blank_comments(text)
+    states = branch_states(sources)
+    live = _keep_lines(sources, states, True)
+    errors += check_includes(live, shader_name, include_roots)
+    errors += check_textures(live, texture_roots)
+    if warnings is not None and None in states:
+        unsure = _keep_lines(sources, states, None)
+        warnings += check_includes(unsure, shader_name, include_roots)
+        warnings += check_textures(unsure, texture_roots)
+    if values:
+        errors += check_values(specs, values)
+    return errors
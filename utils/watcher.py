@@ -0,0 +1,222 @@
+import os
+import struct
+import asyncio
+import ctypes
+from pathlib import Path
+from utils.constants import logger, destination_folder
+from utils.state import State
+from utils.catalog import (
+    scan_catalog, scan_package, catalog_add, catalog_remove, catalog_add_package, catalog_remove_package,
+)
+from utils.fx import resolve_dependencies
+from utils.shader import apply_shader_internal, active_chain
+from utils.crash import trigger_crash_detection, cancel_crash_detection
+from utils.aio import run_blocking
+from utils.search import forget_shader
+
+# ---------------------------------------------------------------------------
+# inotify watcher on destination_folder (Linux only, via libc + ctypes)
+# ---------------------------------------------------------------------------
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+_EVENT = struct.Struct("iIII")
+
+RELOAD_DEBOUNCE = 1.0
+
+
+class _Watcher:
+    def __init__(self, libc, fd: int):
+        self.libc = libc
+        self.fd = fd
+        self.wds = {}  # {wd: path relative to destination_folder}
+        self.tasks = set()  # disk work scheduled by events, run on the I/O pool
+
+    def add_tree(self, rel: str):
+        root = Path(destination_folder) / rel
+        for dirpath, dirs, files in os.walk(root):
+            dirs[:] = [d for d in dirs if not d.startswith(".")]
+            self.add(os.path.relpath(dirpath, destination_folder))
+
+    def add(self, rel: str):
+        path = os.path.join(destination_folder, rel).encode()
+        wd = self.libc.inotify_add_watch(self.fd, path, _WATCH_MASK)
+        if wd < 0:
+            logger.error(f"inotify_add_watch failed for {rel}: {os.strerror(ctypes.get_errno())}")
+            return
+        self.wds[wd] = "" if rel == "." else rel
+
+    def spawn(self, coro):
+        task = asyncio.ensure_future(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    def close(self):
+        for task in list(self.tasks):
+            task.cancel()
+        try:
+            asyncio.get_event_loop().remove_reader(self.fd)
+        except Exception:
+            pass
+        os.close(self.fd)
+
+
+def _read_events(watcher: _Watcher):
+    try:
+        buf = os.read(watcher.fd, 64 * 1024)
+    except BlockingIOError:
+        return
+    except OSError as e:
+        logger.error(f"inotify read failed: {e}")
+        return
+    offset = 0
+    while offset + _EVENT.size <= len(buf):
+        wd, mask, cookie, length = _EVENT.unpack_from(buf, offset)
+        name = buf[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b"\0").decode(errors="replace")
+        offset += _EVENT.size + length
+        parent = watcher.wds.get(wd)
+        if parent is None:
+            continue
+        if mask & IN_IGNORED:
+            watcher.wds.pop(wd, None)
+            continue
+        if not name or name.startswith(".reshadeck"):
+            continue
+        _handle_event(watcher, os.path.join(parent, name) if parent else name, mask)
+
+
+def _handle_event(watcher: _Watcher, rel: str, mask: int):
+    # Runs in the add_reader callback: only the in-memory catalog is updated
+    # here, anything touching the disk is scheduled onto the I/O pool
+    created = mask & (IN_CREATE | IN_MOVED_TO | IN_CLOSE_WRITE)
+    if mask & IN_ISDIR:
+        if "/" not in rel:
+            if created:
+                catalog_add_package(rel)
+            else:
+                catalog_remove_package(rel)
+        if mask & (IN_CREATE | IN_MOVED_TO) and not Path(rel).name.startswith("."):
+            watcher.spawn(_add_directory(watcher, rel))
+        return
+
+    if not rel.endswith((".fx", ".fxh")):
+        return
+    if created:
+        catalog_add(rel)
+    else:
+        catalog_remove(rel)
+    # Cached merged chains skip validation, which a header change could invalidate
+    State.compiled_chains.clear()
+    if rel.endswith(".fx"):
+        State.params_meta.pop(rel)
+        forget_shader(rel)
+    logger.debug(f"Shader file changed: {rel}")
+    if State.live_reload:
+        watcher.spawn(_reload_if_affected(rel))
+
+
+async def _add_directory(watcher: _Watcher, rel: str):
+    """Watch a new directory tree; a new package also gets the files already in it."""
+    package = "/" not in rel
+
+    def _scan():
+        watcher.add_tree(rel)
+        return scan_package(rel) if package else set()
+
+    try:
+        names = await run_blocking(_scan)
+    except Exception as e:
+        logger.error(f"Failed to watch {rel}: {e}")
+        return
+    if package and State.catalog is not None and rel in State.catalog:
+        catalog_add_package(rel, names)
+
+
+async def _reload_if_affected(rel: str):
+    if State.active_shader == "None" or not State.master_switch:
+        return
+    chain = active_chain(State.active_shader)
+    if rel in chain or (rel.endswith(".fxh") and await run_blocking(_chain_includes, chain, rel)):
+        schedule_reload()
+
+
+def _chain_includes(chain: list, rel: str) -> bool:
+    for shader in chain:
+        try:
+            text = (Path(destination_folder) / shader).read_text(encoding="utf-8", errors="replace")
+        except Exception:
+            continue
+        includes, _ = resolve_dependencies(shader, text, Path(destination_folder))
+        if rel in includes:
+            return True
+    return False
+
+
+async def _reload_active_shader():
+    try:
+        await asyncio.sleep(RELOAD_DEBOUNCE)
+        if not State.master_switch or State.active_shader == "None":
+            return
+        logger.info(f"Live reload: re-applying {State.active_shader}")
+        cancel_crash_detection()
+        trigger_crash_detection()
+        await apply_shader_internal(State.active_shader)
+    except asyncio.CancelledError:
+        pass
+    finally:
+        if State.reload_task is asyncio.current_task():
+            State.reload_task = None
+
+
+def schedule_reload():
+    if State.reload_task:
+        State.reload_task.cancel()
+    State.reload_task = asyncio.create_task(_reload_active_shader())
+
+
+async def start_watcher() -> bool:
+    """Build the catalog and start watching destination_folder for changes."""
+    if State.watcher is not None:
+        return True
+    try:
+        libc = ctypes.CDLL("libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+    except Exception as e:
+        logger.warning(f"File watching unavailable, catalog will be rescanned per call: {e}")
+        return False
+
+    watcher = _Watcher(libc, fd)
+
+    def _prepare():
+        Path(destination_folder).mkdir(parents=True, exist_ok=True)
+        watcher.add_tree(".")
+        return scan_catalog()
+
+    State.catalog = await run_blocking(_prepare)
+    State.catalog_version += 1
+    asyncio.get_event_loop().add_reader(fd, _read_events, watcher)
+    State.watcher = watcher
+    logger.info(f"Watching {destination_folder} ({len(watcher.wds)} directories)")
+    return True
+
+
+def stop_watcher():
+    if State.reload_task:
+        State.reload_task.cancel()
+        State.reload_task = None
+    if State.watcher is not None:
+        State.watcher.close()
+        State.watcher = None
+    State.catalog = None